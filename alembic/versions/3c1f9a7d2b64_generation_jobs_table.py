@@ -0,0 +1,50 @@
+"""generation jobs table
+
+Revision ID: 3c1f9a7d2b64
+Revises: cf2fb933b5d8
+Create Date: 2026-10-18 13:02:11.418207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f9a7d2b64'
+down_revision: Union[str, Sequence[str], None] = 'cf2fb933b5d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('generation_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('max_attempts', sa.Integer(), nullable=False),
+    sa.Column('run_after', sa.DateTime(), nullable=False),
+    sa.Column('locked_by', sa.String(), nullable=True),
+    sa.Column('locked_at', sa.DateTime(), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('course_id', sa.Integer(), nullable=True),
+    sa.Column('roadmap_id', sa.Integer(), nullable=True),
+    sa.Column('chapters_total', sa.Integer(), nullable=False),
+    sa.Column('chapters_done', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['course_id'], ['courses.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['roadmap_id'], ['roadmaps.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_generation_jobs_status_run_after', 'generation_jobs', ['status', 'run_after'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_generation_jobs_status_run_after', table_name='generation_jobs')
+    op.drop_table('generation_jobs')
@@ -0,0 +1,90 @@
+"""unique chapter number per course
+
+Revision ID: 6b2e9f4d1c83
+Revises: c4d8e1f2a365
+Create Date: 2026-10-18 16:21:40.338215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6b2e9f4d1c83'
+down_revision: Union[str, Sequence[str], None] = 'c4d8e1f2a365'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Concurrent create and resume jobs could store a chapter twice: keep the first copy
+    bind = op.get_bind()
+    duplicates = bind.execute(sa.text(
+        "SELECT c.id, k.keep_id FROM chapters c JOIN ("
+        "SELECT course_id, chapter_number, MIN(id) AS keep_id FROM chapters "
+        "WHERE chapter_number IS NOT NULL GROUP BY course_id, chapter_number HAVING COUNT(*) > 1"
+        ") k ON k.course_id = c.course_id AND k.chapter_number = c.chapter_number "
+        "WHERE c.id <> k.keep_id"
+    )).all()
+
+    # user_progress.chapter_id has no ON DELETE: move progress onto the kept copy
+    # first, merging rows that would break uq_user_progress_user_course_chapter
+    touched = set()
+    for chapter_id, keep_id in duplicates:
+        progress = bind.execute(
+            sa.text("SELECT id, user_id, course_id, status FROM user_progress WHERE chapter_id = :chapter_id"),
+            {"chapter_id": chapter_id}
+        ).all()
+        for progress_id, user_id, course_id, status in progress:
+            touched.add((user_id, course_id))
+            kept = bind.execute(
+                sa.text(
+                    "SELECT id FROM user_progress "
+                    "WHERE user_id = :user_id AND course_id = :course_id AND chapter_id = :keep_id"
+                ),
+                {"user_id": user_id, "course_id": course_id, "keep_id": keep_id}
+            ).scalar()
+            if kept is None:
+                bind.execute(
+                    sa.text("UPDATE user_progress SET chapter_id = :keep_id WHERE id = :id"),
+                    {"keep_id": keep_id, "id": progress_id}
+                )
+                continue
+            if status:
+                # Completed on either copy counts as completed
+                bind.execute(sa.text("UPDATE user_progress SET status = :status WHERE id = :id"), {"status": True, "id": kept})
+            bind.execute(sa.text("DELETE FROM user_progress WHERE id = :id"), {"id": progress_id})
+        bind.execute(sa.text("DELETE FROM chapters WHERE id = :id"), {"id": chapter_id})
+
+    # Recount the summaries of merged progress (same rollup as c4d8e1f2a365)
+    completed = "SUM(CASE WHEN up.status THEN 1 ELSE 0 END)"
+    for user_id, course_id in touched:
+        params = {"user_id": user_id, "course_id": course_id}
+        bind.execute(
+            sa.text("DELETE FROM course_progress_summaries WHERE user_id = :user_id AND course_id = :course_id"),
+            params
+        )
+        bind.execute(sa.text(
+            "INSERT INTO course_progress_summaries "
+            "(user_id, course_id, completed_chapters, total_chapters, percent_complete, last_activity_at) "
+            f"SELECT up.user_id, up.course_id, {completed}, COALESCE(c.total_chapters, 0), "
+            "CASE WHEN COALESCE(c.total_chapters, 0) <= 0 THEN 0.0 "
+            f"WHEN {completed} >= c.total_chapters THEN 100.0 "
+            f"ELSE 100.0 * {completed} / c.total_chapters END, "
+            "MAX(up.updated_at) "
+            "FROM user_progress up JOIN courses c ON c.id = up.course_id "
+            "WHERE up.user_id = :user_id AND up.course_id = :course_id "
+            "GROUP BY up.user_id, up.course_id, c.total_chapters"
+        ), params)
+
+    op.drop_index('ix_chapters_course_id_chapter_number', table_name='chapters')
+    op.create_index('ix_chapters_course_id_chapter_number', 'chapters', ['course_id', 'chapter_number'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_chapters_course_id_chapter_number', table_name='chapters')
+    op.create_index('ix_chapters_course_id_chapter_number', 'chapters', ['course_id', 'chapter_number'], unique=False)
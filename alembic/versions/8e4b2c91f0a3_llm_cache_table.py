@@ -0,0 +1,37 @@
+"""llm cache table
+
+Revision ID: 8e4b2c91f0a3
+Revises: 3c1f9a7d2b64
+Create Date: 2026-10-18 13:05:42.907114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4b2c91f0a3'
+down_revision: Union[str, Sequence[str], None] = '3c1f9a7d2b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('llm_cache',
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('kind', sa.String(), nullable=False),
+    sa.Column('model', sa.String(), nullable=False),
+    sa.Column('template_hash', sa.String(length=64), nullable=False),
+    sa.Column('response', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('key')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('llm_cache')
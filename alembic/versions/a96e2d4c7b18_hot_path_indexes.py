@@ -0,0 +1,42 @@
+"""hot path indexes and unique user progress
+
+Revision ID: a96e2d4c7b18
+Revises: f83c1d5e2b47
+Create Date: 2026-10-18 14:02:11.604357
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a96e2d4c7b18'
+down_revision: Union[str, Sequence[str], None] = 'f83c1d5e2b47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_chapters_course_id_chapter_number', 'chapters', ['course_id', 'chapter_number'], unique=False)
+    op.create_index('ix_sections_chapter_id_id', 'sections', ['chapter_id', 'id'], unique=False)
+    op.create_index('ix_roadmap_steps_roadmap_id_order_index', 'roadmap_steps', ['roadmap_id', 'order_index'], unique=False)
+
+    # save_progress never checked atomically: keep the first row of any duplicates
+    op.execute(
+        "DELETE FROM user_progress WHERE id NOT IN ("
+        "SELECT MIN(id) FROM user_progress GROUP BY user_id, course_id, chapter_id)"
+    )
+    with op.batch_alter_table('user_progress') as batch_op:
+        batch_op.create_unique_constraint('uq_user_progress_user_course_chapter', ['user_id', 'course_id', 'chapter_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('user_progress') as batch_op:
+        batch_op.drop_constraint('uq_user_progress_user_course_chapter', type_='unique')
+    op.drop_index('ix_roadmap_steps_roadmap_id_order_index', table_name='roadmap_steps')
+    op.drop_index('ix_sections_chapter_id_id', table_name='sections')
+    op.drop_index('ix_chapters_course_id_chapter_number', table_name='chapters')
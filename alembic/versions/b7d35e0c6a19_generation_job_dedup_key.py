@@ -0,0 +1,34 @@
+"""generation job dedup key
+
+Revision ID: b7d35e0c6a19
+Revises: 8e4b2c91f0a3
+Create Date: 2026-10-18 13:09:27.331560
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d35e0c6a19'
+down_revision: Union[str, Sequence[str], None] = '8e4b2c91f0a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('generation_jobs', sa.Column('dedup_key', sa.String(), nullable=True))
+    op.create_index(
+        'uq_generation_jobs_active_dedup_key', 'generation_jobs', ['dedup_key'], unique=True,
+        postgresql_where=sa.text("status IN ('pending', 'running')"),
+        sqlite_where=sa.text("status IN ('pending', 'running')")
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_generation_jobs_active_dedup_key', table_name='generation_jobs')
+    op.drop_column('generation_jobs', 'dedup_key')
@@ -0,0 +1,54 @@
+"""course progress summaries
+
+Revision ID: c4d8e1f2a365
+Revises: a96e2d4c7b18
+Create Date: 2026-10-18 14:38:52.117094
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d8e1f2a365'
+down_revision: Union[str, Sequence[str], None] = 'a96e2d4c7b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('course_progress_summaries',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('course_id', sa.Integer(), nullable=False),
+    sa.Column('completed_chapters', sa.Integer(), nullable=False),
+    sa.Column('total_chapters', sa.Integer(), nullable=False),
+    sa.Column('percent_complete', sa.Float(), nullable=False),
+    sa.Column('last_activity_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['course_id'], ['courses.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'course_id')
+    )
+    op.create_index('ix_course_progress_summaries_user_id_last_activity_at', 'course_progress_summaries', ['user_id', 'last_activity_at'], unique=False)
+
+    # Summarize the progress saved so far (same rollup as _refresh_progress_summaries)
+    completed = "SUM(CASE WHEN up.status THEN 1 ELSE 0 END)"
+    op.execute(
+        "INSERT INTO course_progress_summaries "
+        "(user_id, course_id, completed_chapters, total_chapters, percent_complete, last_activity_at) "
+        f"SELECT up.user_id, up.course_id, {completed}, COALESCE(c.total_chapters, 0), "
+        "CASE WHEN COALESCE(c.total_chapters, 0) <= 0 THEN 0.0 "
+        f"WHEN {completed} >= c.total_chapters THEN 100.0 "
+        f"ELSE 100.0 * {completed} / c.total_chapters END, "
+        "MAX(up.updated_at) "
+        "FROM user_progress up JOIN courses c ON c.id = up.course_id "
+        "GROUP BY up.user_id, up.course_id, c.total_chapters"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_course_progress_summaries_user_id_last_activity_at', table_name='course_progress_summaries')
+    op.drop_table('course_progress_summaries')
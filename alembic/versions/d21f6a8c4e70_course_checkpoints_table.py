@@ -0,0 +1,36 @@
+"""course checkpoints table
+
+Revision ID: d21f6a8c4e70
+Revises: b7d35e0c6a19
+Create Date: 2026-10-18 13:14:05.672318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd21f6a8c4e70'
+down_revision: Union[str, Sequence[str], None] = 'b7d35e0c6a19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('course_checkpoints',
+    sa.Column('course_id', sa.Integer(), nullable=False),
+    sa.Column('outline', sa.JSON(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['course_id'], ['courses.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('course_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('course_checkpoints')
@@ -0,0 +1,30 @@
+"""chapter learning objectives and sections status
+
+Revision ID: e5a0c3b7d912
+Revises: d21f6a8c4e70
+Create Date: 2026-10-18 13:19:48.104255
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a0c3b7d912'
+down_revision: Union[str, Sequence[str], None] = 'd21f6a8c4e70'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('chapters', sa.Column('learning_objectives', sa.JSON(), nullable=True))
+    op.add_column('chapters', sa.Column('sections_status', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('chapters', 'sections_status')
+    op.drop_column('chapters', 'learning_objectives')
@@ -0,0 +1,69 @@
+"""search documents table
+
+Revision ID: f83c1d5e2b47
+Revises: e5a0c3b7d912
+Create Date: 2026-10-18 13:27:36.518902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f83c1d5e2b47'
+down_revision: Union[str, Sequence[str], None] = 'e5a0c3b7d912'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    is_postgres = op.get_bind().dialect.name == 'postgresql'
+    op.create_table('search_documents',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(), nullable=False),
+    sa.Column('course_id', sa.Integer(), nullable=False),
+    sa.Column('chapter_id', sa.Integer(), nullable=True),
+    sa.Column('title', sa.String(), nullable=True),
+    sa.Column('body', sa.Text(), nullable=True),
+    sa.Column('search_vector', postgresql.TSVECTOR() if is_postgres else sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['chapter_id'], ['chapters.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['course_id'], ['courses.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_search_documents_course_id'), 'search_documents', ['course_id'], unique=False)
+
+    # Backfill content generated before search existed
+    op.execute(
+        "INSERT INTO search_documents (kind, course_id, chapter_id, title, body) "
+        "SELECT 'course', id, NULL, title, description FROM courses"
+    )
+    op.execute(
+        "INSERT INTO search_documents (kind, course_id, chapter_id, title, body) "
+        "SELECT 'chapter', course_id, id, title, description FROM chapters WHERE course_id IS NOT NULL"
+    )
+    op.execute(
+        "INSERT INTO search_documents (kind, course_id, chapter_id, title, body) "
+        "SELECT 'section', chapters.course_id, sections.chapter_id, sections.title, sections.content "
+        "FROM sections JOIN chapters ON chapters.id = sections.chapter_id WHERE chapters.course_id IS NOT NULL"
+    )
+
+    if is_postgres:
+        op.execute(
+            "UPDATE search_documents SET search_vector = "
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(body, '')), 'B')"
+        )
+        op.create_index('ix_search_documents_search_vector', 'search_documents', ['search_vector'],
+                        unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_search_documents_search_vector', table_name='search_documents', postgresql_using='gin')
+    op.drop_index(op.f('ix_search_documents_course_id'), table_name='search_documents')
+    op.drop_table('search_documents')
@@ -1,3 +1,4 @@
+import os
 from fastapi.middleware.cors import CORSMiddleware
 
 origins = [
@@ -14,3 +15,89 @@ def setup_cors(app):
         allow_headers=["*"],
 )
 
+# LLM backend: "groq", or "fake" for offline load tests and benchmarks (see app/services/llm_providers.py)
+LLM_PROVIDER = os.environ.get("LLM_PROVIDER", "groq")
+LLM_MODEL = os.environ.get("LLM_MODEL", "openai/gpt-oss-20b")
+LLM_TEMPERATURE = float(os.environ.get("LLM_TEMPERATURE", 0.3))
+# Fake provider: simulated latency per call, share of calls that raise, and output size
+FAKE_LLM_LATENCY_SECONDS = float(os.environ.get("FAKE_LLM_LATENCY_SECONDS", 0.5))
+FAKE_LLM_FAILURE_RATE = float(os.environ.get("FAKE_LLM_FAILURE_RATE", 0))
+FAKE_LLM_SEED = int(os.environ.get("FAKE_LLM_SEED", 0))
+FAKE_LLM_CHAPTERS = int(os.environ.get("FAKE_LLM_CHAPTERS", 5))
+FAKE_LLM_SECTIONS = int(os.environ.get("FAKE_LLM_SECTIONS", 6))
+
+# LLM provider quota (Groq limits are expressed per minute)
+LLM_REQUESTS_PER_MINUTE = int(os.environ.get("LLM_REQUESTS_PER_MINUTE", 30))
+LLM_TOKENS_PER_MINUTE = int(os.environ.get("LLM_TOKENS_PER_MINUTE", 8000))
+LLM_MAX_TOKENS = int(os.environ.get("LLM_MAX_TOKENS", 4000))
+
+# How many chapters of one course are expanded at the same time
+CHAPTER_CONCURRENCY = int(os.environ.get("CHAPTER_CONCURRENCY", 3))
+# Completion tokens reserved against the tokens/min budget for every LLM call
+LLM_COMPLETION_TOKEN_ESTIMATE = int(os.environ.get("LLM_COMPLETION_TOKEN_ESTIMATE", 2000))
+# Ask the provider for JSON-only replies (response_format=json_object) where output is parsed as JSON
+LLM_JSON_MODE = os.environ.get("LLM_JSON_MODE", "true").lower() == "true"
+
+# Background generation jobs
+JOB_WORKER_CONCURRENCY = int(os.environ.get("JOB_WORKER_CONCURRENCY", 2))
+JOB_POLL_INTERVAL_SECONDS = float(os.environ.get("JOB_POLL_INTERVAL_SECONDS", 2))
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", 3))
+JOB_RETRY_BACKOFF_SECONDS = int(os.environ.get("JOB_RETRY_BACKOFF_SECONDS", 30))
+# A running job whose lock is older than this is assumed orphaned (worker died) and reclaimed
+JOB_LOCK_TIMEOUT_SECONDS = int(os.environ.get("JOB_LOCK_TIMEOUT_SECONDS", 900))
+# GET /jobs/{id}/events re-reads the job row this often when no in-process event arrives
+# (the job may be running in another worker process)
+JOB_EVENTS_POLL_SECONDS = float(os.environ.get("JOB_EVENTS_POLL_SECONDS", 2))
+
+# Database connection pool (per uvicorn worker process)
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = int(os.environ.get("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "true").lower() == "true"
+# Number of compiled SQL statements SQLAlchemy keeps per engine (0 disables the cache)
+DB_QUERY_CACHE_SIZE = int(os.environ.get("DB_QUERY_CACHE_SIZE", 500))
+
+# In-process cache for generated course / roadmap content (immutable once written)
+CONTENT_CACHE_MAXSIZE = int(os.environ.get("CONTENT_CACHE_MAXSIZE", 2048))
+CONTENT_CACHE_TTL_SECONDS = int(os.environ.get("CONTENT_CACHE_TTL_SECONDS", 600))
+# "memory" (per process) or "redis" (shared by all workers, needs REDIS_URL)
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "memory")
+REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+# How long a worker loading a cold key holds the cross-worker fill lock
+CACHE_LOCK_TIMEOUT_SECONDS = float(os.environ.get("CACHE_LOCK_TIMEOUT_SECONDS", 10))
+
+# Cache-Control for read endpoints. Generated content never changes once written;
+# listings grow as new courses/roadmaps are generated so they revalidate sooner
+HTTP_CACHE_CONTROL = os.environ.get("HTTP_CACHE_CONTROL", "public, max-age=300, stale-while-revalidate=86400")
+HTTP_LIST_CACHE_CONTROL = os.environ.get("HTTP_LIST_CACHE_CONTROL", "public, max-age=60")
+
+# Keyset pagination of the course / roadmap listings
+LIST_PAGE_SIZE = int(os.environ.get("LIST_PAGE_SIZE", 20))
+LIST_MAX_PAGE_SIZE = int(os.environ.get("LIST_MAX_PAGE_SIZE", 100))
+
+# Full-text search: "postgres" (tsvector + GIN), "memory" (in-process inverted index)
+# or "auto" (postgres on PostgreSQL, memory elsewhere)
+SEARCH_BACKEND = os.environ.get("SEARCH_BACKEND", "auto")
+
+# Most chapter completions accepted by one POST /progress/save-batch (one INSERT statement)
+PROGRESS_BATCH_MAX_ITEMS = int(os.environ.get("PROGRESS_BATCH_MAX_ITEMS", 500))
+
+# Password hashing. bcrypt runs off the event loop in a dedicated pool ("thread" or "process");
+# raising BCRYPT_ROUNDS rehashes existing passwords on their next successful login
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", 12))
+PASSWORD_HASH_EXECUTOR = os.environ.get("PASSWORD_HASH_EXECUTOR", "thread")
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+
+# Auth caches: decoded JWTs (kept until the token expires) and user rows looked up by require_user
+AUTH_TOKEN_CACHE_MAXSIZE = int(os.environ.get("AUTH_TOKEN_CACHE_MAXSIZE", 10000))
+AUTH_USER_CACHE_MAXSIZE = int(os.environ.get("AUTH_USER_CACHE_MAXSIZE", 10000))
+AUTH_USER_CACHE_TTL_SECONDS = int(os.environ.get("AUTH_USER_CACHE_TTL_SECONDS", 60))
+
+# Persistent cache of parsed LLM responses (llm_cache table). TTL 0 keeps entries forever
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_TTL_SECONDS = int(os.environ.get("LLM_CACHE_TTL_SECONDS", 30 * 24 * 3600))
+
+# Lazy course generation: store only the outline and expand a chapter the first time
+# its sections are read (the next chapter is prefetched). Overridable per request
+COURSE_LAZY_CHAPTERS = os.environ.get("COURSE_LAZY_CHAPTERS", "false").lower() == "true"
@@ -1,11 +1,16 @@
-from .db import session
 from datetime import datetime,timedelta
-from .models import Otp, User
+from sqlalchemy import select
+from .models import Otp, User, as_dict
+from .db import get_db
+from app.core.config import BCRYPT_ROUNDS
+from app.utils.cache import token_cache, user_cache
 from app.utils.logger import get_logger
+from app.utils.password_pool import password_pool
 
 from typing import Optional, Callable
 import os 
 import json
+import hashlib
 from jose import jwt, JWTError
 from jose.exceptions import ExpiredSignatureError
 import random
@@ -13,6 +18,7 @@ import bcrypt
 from functools import wraps
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi import Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
 security = HTTPBearer()
 
@@ -22,7 +28,7 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 7 * 24 * 60  # 7 days
 
 
-def generate_otp(email: str):
+async def generate_otp(db, email: str):
     if not email:
         return None
 
@@ -41,29 +47,29 @@ def generate_otp(email: str):
 
     try:
         # Add and commit to DB
-        session.add(otp_obj)
-        session.commit()
-        session.refresh(otp_obj)
+        db.add(otp_obj)
+        await db.commit()
+        await db.refresh(otp_obj)
         return otp_obj
     except Exception as e:
-        session.rollback()
+        await db.rollback()
         raise e  
 
     
-def verify_user(email,otp):
+async def verify_user(db, email,otp):
     if not email or not otp:
         return None
     
     try:
-        result = session.query(Otp).filter(Otp.email == email, Otp.otp == otp).first()
-        if not result:
+        result = await db.execute(select(Otp).where(Otp.email == email, Otp.otp == otp))
+        if not result.scalars().first():
             return False
         return True
     except Exception as e:
-        session.rollback()
+        await db.rollback()
         raise e  
         
-def create_user(user_data):
+async def create_user(db, user_data):
     """
     Create a new user in the database
     """
@@ -72,43 +78,67 @@ def create_user(user_data):
         if 'email' in user_data and user_data['email']:
             user_data['email'] = user_data['email'].lower()
             
-        if find_user(user_data['email']) or  find_user(user_data['username']):
+        if await find_user(db, user_data['email']) or  await find_user(db, user_data['username']):
             return None
         
-        pw_hashed = hash_password(user_data.pop('password'))
+        pw_hashed = await hash_password_async(user_data.pop('password'))
         user_data['hashed_password'] = pw_hashed
         print(user_data)
         new_user = User(**user_data)
-        session.add(new_user)
-        session.commit()
-        session.refresh(new_user)
+        db.add(new_user)
+        await db.commit()
+        await db.refresh(new_user)
         return new_user
     except Exception as e:
-        session.rollback()
+        await db.rollback()
         logger.error(f"Error creating user: {str(e)}")
         raise
      
         
-def find_user(identifier):
+async def find_user(db, identifier):
     try:
         if "@" in identifier:
-            user = session.query(User).filter(User.email == identifier).first()
+            result = await db.execute(select(User).where(User.email == identifier))
         else:
-            user = session.query(User).filter(User.username == identifier).first()
+            result = await db.execute(select(User).where(User.username == identifier))
+        user = result.scalars().first()
         return user
     
     except Exception as e:
-        session.rollback()
+        await db.rollback()
         logger.error(f"Error finding user: {str(e)}")
         raise
 
-def hash_password(password: str) -> str:
+
+def _public_user(user):
+    data = as_dict(user)
+    data.pop('hashed_password', None)
+    return data
+
+
+async def invalidate_user_cache(user_id):
+    await user_cache.delete(f"user:{user_id}")
+
+
+async def get_user_by_id(db, user_id: int):
+    """
+    User data (without the password hash) as a plain dict, cached for
+    AUTH_USER_CACHE_TTL_SECONDS. Call invalidate_user_cache after updating a user.
+    """
+    async def load(db):
+        user = await db.get(User, user_id)
+        return _public_user(user) if user else None
+
+    return await user_cache.get_or_load(f"user:{user_id}", load)
+
+def hash_password(password: str, rounds: int = BCRYPT_ROUNDS) -> str:
     """
     Hash a plaintext password using bcrypt and return a UTF-8 string.
+    Blocks for the whole bcrypt run, use hash_password_async from request handlers.
     """
     try:
         password_bytes = password.encode('utf-8')
-        salt = bcrypt.gensalt()
+        salt = bcrypt.gensalt(rounds=rounds)
         hashed_bytes = bcrypt.hashpw(password_bytes, salt)
         return hashed_bytes.decode('utf-8')
     except Exception as e:
@@ -119,6 +149,7 @@ def hash_password(password: str) -> str:
 def verify_password(password: str, hashed_password: str) -> bool:
     """
     Compare a plaintext password with a hashed one (returns True or False).
+    Blocks for the whole bcrypt run, use verify_password_async from request handlers.
     """
     try:
         # bcrypt.checkpw expects both arguments as bytes
@@ -128,6 +159,52 @@ def verify_password(password: str, hashed_password: str) -> bool:
         raise
 
 
+async def hash_password_async(password: str) -> str:
+    return await password_pool.run(hash_password, password, BCRYPT_ROUNDS)
+
+
+async def verify_password_async(password: str, hashed_password: str) -> bool:
+    return await password_pool.run(verify_password, password, hashed_password)
+
+
+def password_needs_rehash(hashed_password: str, rounds: int = BCRYPT_ROUNDS) -> bool:
+    """
+    True when the stored hash was made with a different cost than BCRYPT_ROUNDS.
+    bcrypt hashes look like $2b$12$..., the second field is the cost.
+    """
+    try:
+        return int(hashed_password.split('$')[2]) != rounds
+    except (IndexError, ValueError):
+        return True
+
+
+async def authenticate_user(db, identifier: str, password: str):
+    """
+    Look up a user and check their password off the event loop.
+
+    Returns (user, password_ok). On success a hash made with an outdated cost
+    is transparently replaced by one using the current BCRYPT_ROUNDS.
+    """
+    user = await find_user(db, identifier)
+    if not user:
+        return None, False
+
+    if not await verify_password_async(password, user.hashed_password):
+        return user, False
+
+    if password_needs_rehash(user.hashed_password):
+        try:
+            user.hashed_password = await hash_password_async(password)
+            await db.commit()
+            await invalidate_user_cache(user.id)
+            logger.info(f"Rehashed password for user id={user.id} with cost {BCRYPT_ROUNDS}")
+        except Exception as e:
+            # The login itself succeeded, the upgrade is retried next time
+            await db.rollback()
+            logger.error(f"Error rehashing password for user id={user.id}: {str(e)}")
+    return user, True
+
+
 def create_token(data: dict, expires_delta: Optional[timedelta] = None):
     """
     Create a new JWT token
@@ -153,19 +230,28 @@ def verify_token(token: str):
     """
     Verify and decode a JWT token
     
+    Decoded payloads are cached by token hash until the token expires, so a
+    client reusing its token skips the signature check on later requests.
+    
     Args:
         token: JWT token
         
     Returns:
-        Tuple of (payload, error_dict) where one will be None
+        The payload, or a dict with "error" and "message" keys
     """
     try:
         if not token or not isinstance(token, str):
-            return None, {"error": "token_invalid", "message": "Invalid token format"}
+            return {"error": "token_invalid", "message": "Invalid token format"}
         
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], options={"verify_exp": True})
+        key = hashlib.sha256(token.encode('utf-8')).hexdigest()
+        payload = token_cache.get(key)
+        if payload is None:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], options={"verify_exp": True})
+            if payload.get("exp"):
+                token_cache.set(key, payload, float(payload["exp"]))
                 
-        return payload
+        # Callers get their own copy so they cannot alter the cached payload
+        return dict(payload)
         
     except ExpiredSignatureError:
         logger.warning(f"Token expired: {token[:10]}...")
@@ -177,7 +263,23 @@ def verify_token(token: str):
         logger.error(f"Token verification error: {str(e)}")
         return {"error": "token_error", "message": "Authentication error. Please log in again."}
 
-def get_current_user(token: str):
+async def resolve_user(db, payload: dict):
+    """
+    User data for a decoded token payload, or None if the user does not exist
+    """
+    user_id = payload.get('user_id')
+    if user_id is not None:
+        return await get_user_by_id(db, int(user_id))
+    
+    # Older tokens only carry 'sub' (username or email)
+    identifier = payload.get('sub')
+    if not identifier:
+        logger.warning("Token payload missing user identifier")
+        return None
+    user = await find_user(db, str(identifier))
+    return _public_user(user) if user else None
+
+async def get_current_user(db, token: str):
     """
     Get user from database based on token
     
@@ -185,32 +287,13 @@ def get_current_user(token: str):
         token: JWT token
         
     Returns:
-        User object or None if token is invalid
+        User data dict or None if token is invalid
     """
     try:
-        payload, error = verify_token(token)
-        print(payload)
-        if error or not payload:
-            return None
-        
-        # Handle both 'sub' (email) and 'user_id' fields for backward compatibility
-        user_identifier = payload.get('sub') or payload.get('user_id')
-        if not user_identifier:
-            logger.warning("Token payload missing user identifier")
+        payload = verify_token(token)
+        if not payload or payload.get("error"):
             return None
-        
-        # Try to find user by email first (if it contains @), then by ID
-        if '@' in str(user_identifier):
-            return find_user(email=user_identifier)
-        elif user_identifier.isdigit():
-            return find_user(phone=user_identifier)
-        else:
-            try:
-                user_id = int(user_identifier)
-                return find_user(id=user_id)
-            except (ValueError, TypeError):
-                return find_user(email=user_identifier)
-            
+        return await resolve_user(db, payload)
                 
     except Exception as e:
         logger.error(f"Error getting current user: {str(e)}")
@@ -239,10 +322,10 @@ def get_optional_user_from_event(event):
             return None
         
         # Verify token
-        payload, error = verify_token(token)
+        payload = verify_token(token)
         
-        if error or not payload:
-            logger.warning(f"Optional auth failed: {error}")
+        if not payload or payload.get("error"):
+            logger.warning(f"Optional auth failed: {payload}")
             return None
             
         return payload
@@ -262,6 +345,20 @@ def require_auth(credentials: HTTPAuthorizationCredentials = Depends(security)):
     return payload  # will be available in route
 
 
+async def require_user(payload: dict = Depends(require_auth), db: AsyncSession = Depends(get_db)):
+    """
+    Like require_auth, but resolves the (cached) user row and rejects
+    deleted or deactivated accounts.
+    """
+    user = await resolve_user(db, payload)
+    if not user or not user.get("is_active", True):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found or inactive"
+        )
+    return user
+
+
 
 
 def validate_jwt_secret():
@@ -1,10 +1,24 @@
-from .db import session
+from sqlalchemy import select, insert, update
+from sqlalchemy.orm import selectinload
 from app.schemas.course import CourseOutline,Chapter,DetailedChapter,Section
-from .models import Course,Chapter,Section
+from .models import Course,Chapter,Section,CourseCheckpoint,as_dict
+from .search import index_course, index_chapters, index_sections
+from app.utils.cache import content_cache
 from slugify import slugify
 
 
-def create_course(course:CourseOutline):
+async def invalidate_course_cache(course_id=None, course_slug=None, chapter_id=None):
+    keys = []
+    if course_id is not None:
+        keys += [f"course:{course_id}", f"chapters:{course_id}"]
+    if course_slug is not None:
+        keys += [f"course-slug:{course_slug}", f"course-tree:{course_slug}"]
+    if chapter_id is not None:
+        keys += [f"sections:{chapter_id}", f"chapter:{chapter_id}"]
+    await content_cache.delete(*keys)
+
+
+async def create_course(db, course:CourseOutline, slug=None):
     new_course = Course(
         title=course.course_title,
         description=course.course_description,
@@ -12,60 +26,228 @@ def create_course(course:CourseOutline):
         duration=course.duration,
         total_chapters = course.total_chapters
     )
-    new_course.slug = slugify(course.course_title)
-    session.add(new_course)
-    session.commit()
+    # A requested slug (e.g. the URL a learner opened) wins over the generated title
+    new_course.slug = slug or slugify(course.course_title)
+    try:
+        db.add(new_course)
+        await db.flush()
+        # Checkpoint the outline with the course so an interrupted generation can resume
+        db.add(CourseCheckpoint(course_id=new_course.id, outline=course.model_dump(mode="json"), status="generating"))
+        await index_course(db, new_course.id)
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        raise e
     
-    session.refresh(new_course) 
+    await db.refresh(new_course) 
+    await invalidate_course_cache(course_id=new_course.id, course_slug=new_course.slug)
     return new_course
 
-def list_courses():
-    courses = session.query(Course).all()
-    return courses
+async def list_courses(db, limit: int, after: int = None):
+    """
+    One page of course summaries ordered by id, using keyset pagination
+    (WHERE id > after) so a page costs the same however deep it is.
+    Only the listing columns are selected. Returns (rows, next_cursor).
+    """
+    query = select(
+        Course.id, Course.title, Course.slug, Course.level, Course.total_chapters, Course.duration
+    ).order_by(Course.id).limit(limit + 1)
+    if after is not None:
+        query = query.where(Course.id > after)
+    result = await db.execute(query)
+    rows = [dict(row) for row in result.mappings().all()]
+    # The extra row only tells whether another page exists
+    next_cursor = rows[limit - 1]["id"] if len(rows) > limit else None
+    return rows[:limit], next_cursor
     
-def create_chapter(Course_id,chapter,chapter_content:DetailedChapter):
-    
-    new_chapter = Chapter(
-        chapter_number=chapter.chapter_number,
-        title=chapter.title,
-        description = chapter.description,
-        estimated_duration= chapter.estimated_duration,
-        course_id = Course_id
-    )
-    
-    session.add(new_chapter)
-    session.commit()
-    
-    for section in chapter_content.sections:
-        
-        new_section = Section(
-                type=section.type,
-                title=section.title,
-                content=section.content,
-                language=section.language,
-                explanation=section.explanation,
-                chapter_id=new_chapter.id
+async def create_chapter(db, Course_id,chapter,chapter_content:DetailedChapter):
+    """
+    Persist a chapter and all of its sections in one transaction, so a chapter
+    is never visible with only part of its sections.
+    """
+    try:
+        new_chapter = Chapter(
+            chapter_number=chapter.chapter_number,
+            title=chapter.title,
+            description = chapter.description,
+            estimated_duration= chapter.estimated_duration,
+            learning_objectives=chapter.learning_objectives,
+            sections_status="ready",
+            course_id = Course_id
         )
-        session.add(new_section)
-        session.commit()
         
-    session.refresh(new_chapter) 
+        db.add(new_chapter)
+        await db.flush()
+        
+        await _insert_sections(db, new_chapter.id, chapter_content)
+        await index_chapters(db, Course_id, new_chapter.id)
+        await index_sections(db, Course_id, new_chapter.id)
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        raise e
+        
+    course = await db.get(Course, Course_id)
+    await invalidate_course_cache(course_id=Course_id, course_slug=course.slug if course else None, chapter_id=new_chapter.id)
     return new_chapter
 
-def get_course(course_id):
-    course = session.query(Course).filter(Course.id == course_id).first()
-    return course
+async def _insert_sections(db, chapter_id, chapter_content:DetailedChapter):
+    sections = [
+        {
+            "type": section.type,
+            "title": section.title,
+            "content": section.content,
+            "language": section.language,
+            "explanation": section.explanation,
+            "chapter_id": chapter_id
+        }
+        for section in chapter_content.sections
+    ]
+    if sections:
+        # One executemany / multi-row INSERT instead of a commit per section
+        await db.execute(insert(Section), sections)
+
+async def create_outline_chapters(db, course_id, chapters):
+    """
+    Persist the outline's chapters without sections (lazy generation), in one
+    multi-row INSERT. Sections are added by add_chapter_sections on first read.
+    """
+    try:
+        await db.execute(insert(Chapter), [
+            {
+                "chapter_number": chapter.chapter_number,
+                "title": chapter.title,
+                "description": chapter.description,
+                "estimated_duration": chapter.estimated_duration,
+                "learning_objectives": chapter.learning_objectives,
+                "sections_status": "pending",
+                "course_id": course_id
+            }
+            for chapter in chapters
+        ])
+        await index_chapters(db, course_id)
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        raise e
+
+    course = await db.get(Course, course_id)
+    await invalidate_course_cache(course_id=course_id, course_slug=course.slug if course else None)
+
+async def add_chapter_sections(db, chapter_id, chapter_content:DetailedChapter):
+    """
+    Store the generated sections of a pending chapter. Returns False without
+    writing anything when the chapter is no longer pending (another worker
+    stored its sections first).
+    """
+    try:
+        claimed = await db.execute(
+            update(Chapter)
+            .where(Chapter.id == chapter_id, Chapter.sections_status == "pending")
+            .values(sections_status="ready")
+        )
+        if claimed.rowcount != 1:
+            await db.rollback()
+            return False
+        chapter = await db.get(Chapter, chapter_id)
+        await _insert_sections(db, chapter_id, chapter_content)
+        await index_sections(db, chapter.course_id, chapter_id)
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        raise e
+
+    course = await db.get(Course, chapter.course_id)
+    await invalidate_course_cache(course_id=course.id, course_slug=course.slug, chapter_id=chapter_id)
+    return True
 
-def get_chapters(course_id):
-    chapters = session.query(Chapter).filter(Chapter.course_id == course_id).all()
+async def get_course_checkpoint(db, course_id):
+    """
+    The course's checkpoint (None for courses generated before checkpoints
+    existed) and the chapter numbers already persisted.
+    """
+    checkpoint = await db.get(CourseCheckpoint, course_id)
+    result = await db.execute(select(Chapter.chapter_number).where(Chapter.course_id == course_id))
+    return checkpoint, set(result.scalars().all())
 
-    return chapters
+async def mark_course_complete(db, course_id):
+    try:
+        checkpoint = await db.get(CourseCheckpoint, course_id)
+        if checkpoint:
+            checkpoint.status = "complete"
+            await db.commit()
+        return checkpoint
+    except Exception as e:
+        await db.rollback()
+        raise e
 
-def get_sections(chapter_id):
-    print("searching chapter id",chapter_id)
-    sections = session.query(Section).filter(Section.chapter_id == chapter_id).all()
-    return sections
+async def get_course(db, course_id):
+    async def load(db):
+        result = await db.execute(select(Course).where(Course.id == course_id))
+        course = result.scalars().first()
+        return as_dict(course) if course else None
+
+    return await content_cache.get_or_load(f"course:{course_id}", load)
+
+def chapters_query(course_id):
+    """A course's chapters in reading order, served by ix_chapters_course_id_chapter_number."""
+    return select(Chapter).where(Chapter.course_id == course_id).order_by(Chapter.chapter_number)
+
+def sections_query(chapter_id):
+    """A chapter's sections in insertion order, served by ix_sections_chapter_id_id."""
+    return select(Section).where(Section.chapter_id == chapter_id).order_by(Section.id)
+
+async def get_chapters(db, course_id):
+    async def load(db):
+        result = await db.execute(chapters_query(course_id))
+        chapters = result.scalars().all()
+        return [as_dict(chapter) for chapter in chapters]
+
+    return await content_cache.get_or_load(f"chapters:{course_id}", load)
+
+async def get_chapter(db, chapter_id):
+    async def load(db):
+        chapter = await db.get(Chapter, chapter_id)
+        return as_dict(chapter) if chapter else None
+
+    return await content_cache.get_or_load(f"chapter:{chapter_id}", load)
+
+async def get_sections(db, chapter_id):
+    async def load(db):
+        result = await db.execute(sections_query(chapter_id))
+        sections = result.scalars().all()
+        return [as_dict(section) for section in sections]
+
+    return await content_cache.get_or_load(f"sections:{chapter_id}", load)
+
+async def get_course_by_slug(db, course_slug):
+    async def load(db):
+        result = await db.execute(select(Course).where(Course.slug == course_slug))
+        course = result.scalars().first()
+        return as_dict(course) if course else None
+
+    return await content_cache.get_or_load(f"course-slug:{course_slug}", load)
+
+async def get_course_tree(db, course_slug):
+    """
+    Load a course with its chapters and their sections in three queries
+    (course, chapters IN (...), sections IN (...)) regardless of size.
+    """
+    async def load(db):
+        result = await db.execute(
+            select(Course)
+            .where(Course.slug == course_slug)
+            .options(selectinload(Course.chapters).selectinload(Chapter.sections))
+        )
+        course = result.scalars().first()
+        if not course:
+            return None
+        return {
+            **as_dict(course),
+            "chapters": [
+                {**as_dict(chapter), "sections": [as_dict(section) for section in chapter.sections]}
+                for chapter in course.chapters
+            ]
+        }
 
-def get_course_by_slug(course_slug):
-    course = session.query(Course).filter(Course.slug == course_slug).first()
-    return course
+    return await content_cache.get_or_load(f"course-tree:{course_slug}", load)
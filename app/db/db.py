@@ -7,37 +7,128 @@ load_dotenv()
 DB_URI = os.environ.get('DB_URI')
 
 import sqlalchemy
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from app.core.config import (
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING,
+    DB_QUERY_CACHE_SIZE
+)
+from app.utils.metrics import metrics, hit_ratio
 # from psycopg2.extensions import register_adapter, AsIs
 
 print(DB_URI)
 
+# Async drivers used by the application for each sync DB_URI dialect
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
 engine = None
 Session = None
+sync_engine = None
+SyncSession = None
 
 
+def get_async_db_uri(connection_string: str) -> str:
+    """
+    Map DB_URI (e.g. postgresql+psycopg2://...) onto its async driver.
+    ASYNC_DB_URI overrides the mapping when set.
+    """
+    if os.environ.get("ASYNC_DB_URI"):
+        return os.environ["ASYNC_DB_URI"]
+    url = make_url(connection_string)
+    drivername = ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername)
+    return url.set(drivername=drivername).render_as_string(hide_password=False)
 
-def get_db_session():
-    global Session
-    if Session is None:
-        engine = get_db_engine()
-        Session = sessionmaker(bind=engine)
-    return Session()
+
+def _engine_options(connection_string: str) -> dict:
+    pool_options = {}
+    if not connection_string.startswith("sqlite"):
+        pool_options = dict(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
+    return dict(
+        isolation_level="READ UNCOMMITTED",
+        query_cache_size=DB_QUERY_CACHE_SIZE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        **pool_options
+    )
 
 
 def get_db_engine():
+    """
+    AsyncEngine used by the application (routers, services, job workers).
+    """
     global engine
     if engine is None:
         connection_string = str(DB_URI)
-        engine = sqlalchemy.create_engine(connection_string, isolation_level="READ UNCOMMITTED", query_cache_size=0)
+        engine = create_async_engine(get_async_db_uri(connection_string), **_engine_options(connection_string))
+        event.listen(engine.sync_engine, "after_cursor_execute", _record_query_cache_stats)
     return engine
 
+
+def get_sync_db_engine():
+    """
+    Blocking engine for scripts and benchmarks that run outside the event loop.
+    """
+    global sync_engine
+    if sync_engine is None:
+        connection_string = str(DB_URI)
+        sync_engine = sqlalchemy.create_engine(connection_string, **_engine_options(connection_string))
+        event.listen(sync_engine, "after_cursor_execute", _record_query_cache_stats)
+    return sync_engine
+
+
+def _record_query_cache_stats(conn, cursor, statement, parameters, context, executemany):
+    # context.cache_hit is a CacheStats member: CACHE_HIT, CACHE_MISS, CACHING_DISABLED, ...
+    if context is not None:
+        metrics.incr("db_query_cache", context.cache_hit.name.lower())
+
+
+def get_query_cache_stats():
+    counters = metrics.get("db_query_cache")
+    hits = counters.get("cache_hit", 0)
+    misses = counters.get("cache_miss", 0)
+    active_engine = engine.sync_engine if engine is not None else sync_engine
+    compiled_cache = getattr(active_engine, "_compiled_cache", None)
+    return {
+        "capacity": DB_QUERY_CACHE_SIZE,
+        "size": len(compiled_cache) if compiled_cache is not None else 0,
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": hit_ratio(hits, misses),
+        "uncached": sum(count for name, count in counters.items() if name not in ("cache_hit", "cache_miss")),
+    }
+
 def get_db_session():
+    """
+    Return a new AsyncSession. Callers own it and must close it
+    (use it as a context manager: `async with get_db_session() as db:`).
+    """
     global Session
     if Session is None:
-        engine = get_db_engine()
-        Session = sessionmaker(bind=engine)
+        # Keep attributes loaded after commit: objects are serialized after the
+        # session is closed and AsyncSession cannot lazy-load on attribute access
+        Session = async_sessionmaker(bind=get_db_engine(), expire_on_commit=False)
     return Session()
 
-session = get_db_session()
 
+def get_sync_db_session():
+    global SyncSession
+    if SyncSession is None:
+        SyncSession = sessionmaker(bind=get_sync_db_engine(), expire_on_commit=False)
+    return SyncSession()
+
+
+async def get_db():
+    """
+    FastAPI dependency yielding one AsyncSession per request, closed when the request ends.
+    """
+    async with get_db_session() as db:
+        yield db
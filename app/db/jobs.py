@@ -0,0 +1,231 @@
+import asyncio
+from datetime import datetime, timedelta
+from sqlalchemy import select, update, or_, and_
+from sqlalchemy.exc import IntegrityError
+
+from .db import get_db_session
+from .models import GenerationJob
+from app.core.config import JOB_MAX_ATTEMPTS, JOB_RETRY_BACKOFF_SECONDS, JOB_LOCK_TIMEOUT_SECONDS
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+ACTIVE_STATUSES = ("pending", "running")
+
+# dedup_key -> task of the enqueue running in this process, so a burst of
+# identical requests makes one round-trip instead of one each
+_inflight_enqueues = {}
+
+
+async def find_active_job(db, dedup_key: str):
+    result = await db.execute(
+        select(GenerationJob)
+        .where(GenerationJob.dedup_key == dedup_key, GenerationJob.status.in_(ACTIVE_STATUSES))
+        .limit(1)
+    )
+    return result.scalars().first()
+
+
+async def find_course_job_key(db, course_id: int):
+    """
+    Dedup key of the latest job that generated `course_id`, or None for courses
+    created before jobs recorded it.
+    """
+    result = await db.execute(
+        select(GenerationJob.dedup_key)
+        .where(GenerationJob.course_id == course_id, GenerationJob.dedup_key.is_not(None))
+        .order_by(GenerationJob.id.desc())
+        .limit(1)
+    )
+    return result.scalars().first()
+
+
+async def enqueue_job(db, kind: str, payload: dict, max_attempts: int = JOB_MAX_ATTEMPTS, dedup_key: str = None):
+    """
+    Queue a job. With a `dedup_key`, an identical job that is still pending or
+    running is returned instead of queueing a second one.
+    """
+    if not dedup_key:
+        return await _insert_job(db, kind, payload, max_attempts)
+
+    task = _inflight_enqueues.get(dedup_key)
+    if task is None:
+        # Its own task and session, so the request that started it disconnecting
+        # neither cancels the enqueue nor closes its session for the requests attached to it
+        task = asyncio.create_task(_enqueue_unique_job(kind, payload, max_attempts, dedup_key))
+        _inflight_enqueues[dedup_key] = task
+        task.add_done_callback(lambda _: _inflight_enqueues.pop(dedup_key, None))
+    return await asyncio.shield(task)
+
+
+async def _enqueue_unique_job(kind, payload, max_attempts, dedup_key):
+    async with get_db_session() as db:
+        job = await find_active_job(db, dedup_key)
+        if job:
+            logger.info(f"Attaching to active job id={job.id} for '{dedup_key}'")
+            return job
+        try:
+            return await _insert_job(db, kind, payload, max_attempts, dedup_key)
+        except IntegrityError:
+            # Another worker queued the same key between our check and insert;
+            # the partial unique index rejected ours, so attach to theirs
+            job = await find_active_job(db, dedup_key)
+            if not job:
+                raise
+            logger.info(f"Attaching to job id={job.id} queued concurrently for '{dedup_key}'")
+            return job
+
+
+async def _insert_job(db, kind, payload, max_attempts, dedup_key=None):
+    try:
+        job = GenerationJob(
+            kind=kind,
+            payload=payload,
+            status="pending",
+            max_attempts=max_attempts,
+            dedup_key=dedup_key,
+            run_after=datetime.utcnow()
+        )
+        db.add(job)
+        await db.commit()
+        await db.refresh(job)
+        return job
+    except Exception as e:
+        await db.rollback()
+        raise e
+
+
+async def claim_job(db, worker_id: str):
+    """
+    Atomically claim the next runnable job for `worker_id`.
+
+    Runnable means pending and due, or running with a stale lock (its worker
+    died). Rows locked by another worker are skipped via FOR UPDATE SKIP LOCKED,
+    which SQLite silently ignores.
+    """
+    now = datetime.utcnow()
+    stale_before = now - timedelta(seconds=JOB_LOCK_TIMEOUT_SECONDS)
+    try:
+        result = await db.execute(
+            select(GenerationJob)
+            .where(or_(
+                and_(GenerationJob.status == "pending", GenerationJob.run_after <= now),
+                and_(GenerationJob.status == "running", GenerationJob.locked_at < stale_before),
+            ))
+            .order_by(GenerationJob.run_after, GenerationJob.id)
+            .with_for_update(skip_locked=True)
+            .limit(1)
+        )
+        job = result.scalars().first()
+        if not job:
+            await db.commit()
+            return None
+
+        if job.status == "running":
+            logger.warning(f"Reclaiming stale job id={job.id} locked by {job.locked_by}")
+
+        # Compare-and-set on the row we read, so the claim stays exclusive on
+        # databases without row locks: a concurrent claimer matches zero rows
+        claimed = await db.execute(
+            update(GenerationJob)
+            .where(
+                GenerationJob.id == job.id,
+                GenerationJob.status == job.status,
+                GenerationJob.attempts == job.attempts
+            )
+            .values(status="running", attempts=job.attempts + 1, locked_by=worker_id, locked_at=now)
+        )
+        await db.commit()
+        if claimed.rowcount != 1:
+            return None
+        await db.refresh(job)
+        return job
+    except Exception as e:
+        await db.rollback()
+        raise e
+
+
+async def update_job_progress(db, job_id: int, **fields):
+    """
+    Update progress columns (chapters_done, chapters_total, course_id, roadmap_id)
+    and refresh the lock so a long running job is not reclaimed as stale.
+    """
+    try:
+        job = await db.get(GenerationJob, job_id)
+        if not job:
+            return None
+        for key, value in fields.items():
+            setattr(job, key, value)
+        job.locked_at = datetime.utcnow()
+        await db.commit()
+        await db.refresh(job)
+        return job
+    except Exception as e:
+        await db.rollback()
+        raise e
+
+
+async def complete_job(db, job_id: int):
+    try:
+        job = await db.get(GenerationJob, job_id)
+        job.status = "succeeded"
+        job.locked_by = None
+        job.locked_at = None
+        job.last_error = None
+        await db.commit()
+        await db.refresh(job)
+        return job
+    except Exception as e:
+        await db.rollback()
+        raise e
+
+
+async def fail_job(db, job_id: int, error: str):
+    """
+    Record a failed attempt: reschedule with exponential backoff while attempts
+    remain, otherwise mark the job as permanently failed.
+    """
+    try:
+        job = await db.get(GenerationJob, job_id)
+        job.last_error = error
+        job.locked_by = None
+        job.locked_at = None
+        if job.attempts < job.max_attempts:
+            delay = JOB_RETRY_BACKOFF_SECONDS * 2 ** (job.attempts - 1)
+            job.status = "pending"
+            job.run_after = datetime.utcnow() + timedelta(seconds=delay)
+            logger.info(f"Job id={job.id} failed (attempt {job.attempts}/{job.max_attempts}), retrying in {delay}s")
+        else:
+            job.status = "failed"
+            logger.error(f"Job id={job.id} failed permanently after {job.attempts} attempts")
+        await db.commit()
+        await db.refresh(job)
+        return job
+    except Exception as e:
+        await db.rollback()
+        raise e
+
+
+async def release_job(db, job_id: int):
+    """
+    Hand a running job back to the queue without counting the attempt,
+    used when a worker shuts down mid-job.
+    """
+    try:
+        job = await db.get(GenerationJob, job_id)
+        job.status = "pending"
+        job.attempts = max(job.attempts - 1, 0)
+        job.locked_by = None
+        job.locked_at = None
+        job.run_after = datetime.utcnow()
+        await db.commit()
+        return job
+    except Exception as e:
+        await db.rollback()
+        raise e
+
+
+async def get_job(db, job_id: int):
+    job = await db.get(GenerationJob, job_id)
+    return job
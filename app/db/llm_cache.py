@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta
+
+from .models import LLMCacheEntry
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+async def get_llm_response(db, key: str):
+    """
+    Cached response for `key`, or None when missing or expired.
+    """
+    entry = await db.get(LLMCacheEntry, key)
+    if not entry:
+        return None
+    if entry.expires_at and entry.expires_at <= datetime.utcnow():
+        return None
+    return entry.response
+
+
+async def store_llm_response(db, key: str, kind: str, model: str, template_hash: str, response, ttl_seconds: int = 0):
+    try:
+        await db.merge(LLMCacheEntry(
+            key=key,
+            kind=kind,
+            model=model,
+            template_hash=template_hash,
+            response=response,
+            created_at=datetime.utcnow(),
+            expires_at=datetime.utcnow() + timedelta(seconds=ttl_seconds) if ttl_seconds else None
+        ))
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        raise e
+
@@ -1,8 +1,9 @@
 from sqlalchemy import (
     Column, Integer, String, ForeignKey, Text,
     Date, DateTime, Enum, JSON, Float, Boolean,
-    UniqueConstraint
+    UniqueConstraint, Index, text
 )
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -10,6 +11,13 @@ from datetime import datetime
 Base = declarative_base()
 
 
+def as_dict(obj):
+    """
+    Column values of a model instance as a plain dict (safe to cache and share).
+    """
+    return {column.key: getattr(obj, column.key) for column in obj.__table__.columns}
+
+
 class User(Base):
     __tablename__ = "users"
     
@@ -38,11 +46,26 @@ class Course(Base):
     chapters = relationship(
         "Chapter",
         back_populates="course",
+        order_by="Chapter.chapter_number",
         cascade="all, delete-orphan",
         passive_deletes=True
     )
     progress = relationship("UserProgress", back_populates="course", cascade="all, delete-orphan")
 
+class CourseCheckpoint(Base):
+    """
+    Generation state of a course: the outline it was created from and whether
+    every chapter has been persisted. Chapters already in the chapters table
+    are done; the rest of the outline is what a resume still has to expand.
+    """
+    __tablename__ = "course_checkpoints"
+
+    course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True)
+    outline = Column(JSON, nullable=False)
+    status = Column(String, nullable=False, default="generating")  # generating | complete
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 class Chapter(Base):
     __tablename__ = "chapters"
     id = Column(Integer, primary_key=True)
@@ -50,6 +73,10 @@ class Chapter(Base):
     title = Column(String)
     description = Column(Text)
     estimated_duration = Column(Integer)
+    learning_objectives = Column(JSON, nullable=True)
+    # "pending" while only the outline is stored (lazy generation), "ready" once
+    # sections exist; NULL on chapters created before lazy generation
+    sections_status = Column(String, nullable=True)
     course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"))
 
     course = relationship(
@@ -61,11 +88,18 @@ class Chapter(Base):
     sections = relationship(
         "Section",
         back_populates="chapter",
+        order_by="Section.id",
         cascade="all, delete-orphan",
         passive_deletes=True
     )
     progress = relationship("UserProgress", back_populates="chapter", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # get_chapters / the course tree: WHERE course_id = ? ORDER BY chapter_number.
+        # Unique so two generation jobs can never both store the same chapter
+        Index("ix_chapters_course_id_chapter_number", "course_id", "chapter_number", unique=True),
+    )
+
 class Section(Base):
     __tablename__ = "sections"
     id = Column(Integer, primary_key=True)
@@ -82,6 +116,11 @@ class Section(Base):
         passive_deletes=True
     )
 
+    __table_args__ = (
+        # get_sections / the course tree: WHERE chapter_id IN (...) ORDER BY id
+        Index("ix_sections_chapter_id_id", "chapter_id", "id"),
+    )
+
 class Otp(Base):
     __tablename__ = "otp"
     id = Column(Integer, primary_key=True)
@@ -105,7 +144,32 @@ class UserProgress(Base):
     user = relationship("User", back_populates="progress")
     course = relationship("Course", back_populates="progress")
     chapter = relationship("Chapter",back_populates="progress")
+
+    __table_args__ = (
+        # One row per completed chapter; also serves lookups by (user_id) and (user_id, course_id)
+        UniqueConstraint("user_id", "course_id", "chapter_id", name="uq_user_progress_user_course_chapter"),
+    )
     
+class CourseProgressSummary(Base):
+    """
+    Per (user, course) rollup of user_progress, rewritten by save_progress in
+    the same transaction as the progress rows it summarizes, so dashboards
+    read one row per course instead of every completed chapter.
+    """
+    __tablename__ = "course_progress_summaries"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True)
+    completed_chapters = Column(Integer, nullable=False, default=0)
+    total_chapters = Column(Integer, nullable=False, default=0)
+    percent_complete = Column(Float, nullable=False, default=0.0)
+    last_activity_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # The dashboard: WHERE user_id = ? ORDER BY last_activity_at DESC
+        Index("ix_course_progress_summaries_user_id_last_activity_at", "user_id", "last_activity_at"),
+    )
+
 class Roadmap(Base):
     __tablename__ = "roadmaps"
 
@@ -137,3 +201,80 @@ class RoadmapStep(Base):
         "Roadmap",
         back_populates="roadmap_step_relation"
     )
+
+    __table_args__ = (
+        # get_roadmap_steps_by_id: WHERE roadmap_id = ? ORDER BY order_index
+        Index("ix_roadmap_steps_roadmap_id_order_index", "roadmap_id", "order_index"),
+    )
+
+
+class GenerationJob(Base):
+    __tablename__ = "generation_jobs"
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String, nullable=False)  # "course" | "roadmap"
+    payload = Column(JSON, nullable=False)
+    status = Column(String, nullable=False, default="pending")  # pending | running | succeeded | failed
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = Column(String, nullable=True)
+    locked_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    # e.g. "course:python-basics"; at most one pending/running job per key (see index below)
+    dedup_key = Column(String, nullable=True)
+
+    course_id = Column(Integer, ForeignKey("courses.id", ondelete="SET NULL"), nullable=True)
+    roadmap_id = Column(Integer, ForeignKey("roadmaps.id", ondelete="SET NULL"), nullable=True)
+    chapters_total = Column(Integer, nullable=False, default=0)
+    chapters_done = Column(Integer, nullable=False, default=0)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_generation_jobs_status_run_after", "status", "run_after"),
+        Index(
+            "uq_generation_jobs_active_dedup_key", "dedup_key", unique=True,
+            postgresql_where=text("status IN ('pending', 'running')"),
+            sqlite_where=text("status IN ('pending', 'running')")
+        ),
+    )
+
+
+class LLMCacheEntry(Base):
+    """
+    Parsed LLM output keyed by a hash of (model, prompt template, normalized inputs),
+    so the same generation request is only paid for once.
+    """
+    __tablename__ = "llm_cache"
+
+    key = Column(String(64), primary_key=True)  # sha256 hex
+    kind = Column(String, nullable=False)  # course_outline | chapter_content | roadmap
+    model = Column(String, nullable=False)
+    template_hash = Column(String(64), nullable=False)
+    response = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=True)
+
+
+class SearchDocument(Base):
+    """
+    Searchable text of a course, chapter or section, written alongside the
+    content itself. On Postgres `search_vector` holds the weighted tsvector
+    (title A, body B) behind a GIN index; other databases leave it NULL and
+    are searched through the in-memory index in app/utils/search_index.py.
+    """
+    __tablename__ = "search_documents"
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String, nullable=False)  # course | chapter | section
+    course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"), nullable=False, index=True)
+    chapter_id = Column(Integer, ForeignKey("chapters.id", ondelete="CASCADE"), nullable=True)
+    title = Column(String)
+    body = Column(Text)
+    search_vector = Column(Text().with_variant(TSVECTOR(), "postgresql"), nullable=True)
+
+    __table_args__ = (
+        Index("ix_search_documents_search_vector", "search_vector", postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
@@ -1,9 +1,10 @@
 from fastapi import HTTPException
+from sqlalchemy import select, insert
 from app.schemas.roadmap import RoadmapOutline,RoadmapStep
 from app.db.models import Roadmap,RoadmapStep  as RoadmapStepModel
-from .db import session
+from app.utils.cache import content_cache
 
-def create_roadmap(payload: RoadmapOutline):
+async def create_roadmap(db, payload: RoadmapOutline):
     try:
         new_roadmap = Roadmap(
 			name = payload.name,
@@ -12,16 +13,16 @@ def create_roadmap(payload: RoadmapOutline):
 			difficulty = payload.difficulty
 
 		)
-        session.add(new_roadmap)
-        session.commit()
+        db.add(new_roadmap)
+        await db.commit()
         
-        session.refresh(new_roadmap)
+        await db.refresh(new_roadmap)
         return new_roadmap
     except Exception as e:
-        session.rollback()
+        await db.rollback()
         raise e
  
-def create_roadmap_step(payload: RoadmapStep,roadmapid):
+async def create_roadmap_step(db, payload: RoadmapStep,roadmapid):
 	try:
 		step = RoadmapStepModel(
 			title = payload.title,
@@ -32,119 +33,139 @@ def create_roadmap_step(payload: RoadmapStep,roadmapid):
 
 		)
 		
-		session.add(step)
-		session.commit()
+		db.add(step)
+		await db.commit()
 	
-		session.refresh(step)
+		await db.refresh(step)
+		roadmap = await db.get(Roadmap, roadmapid)
+		if roadmap:
+			await content_cache.delete(f"roadmap-slug:{roadmap.slug}")
 	
 		return step
 	except Exception as e:
-			session.rollback()
+			await db.rollback()
 			raise e
  
-def get_roadmaps():
+async def create_roadmap_with_steps(db, payload: RoadmapOutline):
+    """
+    Persist a roadmap and all of its steps atomically: one transaction and a
+    single bulk INSERT for the steps.
+    """
     try:
-        roadmap_list = session.query(Roadmap).all()
-        return roadmap_list
+        new_roadmap = Roadmap(
+            name = payload.name,
+            slug = payload.slug,
+            description = payload.description,
+            difficulty = payload.difficulty
+        )
+        db.add(new_roadmap)
+        await db.flush()
+
+        steps = [
+            {
+                "title": step.title,
+                "topic_slug": step.topic_slug,
+                "description": step.description,
+                "order_index": step.order_index,
+                "roadmap_id": new_roadmap.id
+            }
+            for step in payload.steps
+        ]
+        if steps:
+            await db.execute(insert(RoadmapStepModel), steps)
+        await db.commit()
+
+        await content_cache.delete(f"roadmap-slug:{new_roadmap.slug}")
+        return new_roadmap
     except Exception as e:
+        await db.rollback()
         raise e
+ 
+async def get_roadmaps(db, limit: int, after: int = None):
+    """
+    One page of roadmap summaries ordered by id (keyset pagination, listing
+    columns only). Returns (rows, next_cursor).
+    """
+    query = select(Roadmap.id, Roadmap.name, Roadmap.slug, Roadmap.difficulty).order_by(Roadmap.id).limit(limit + 1)
+    if after is not None:
+        query = query.where(Roadmap.id > after)
+    result = await db.execute(query)
+    rows = [dict(row) for row in result.mappings().all()]
+    next_cursor = rows[limit - 1]["id"] if len(rows) > limit else None
+    return rows[:limit], next_cursor
     
-def get_roadmap_by_id(roadmap_id: int):
+async def get_roadmap_by_id(db, roadmap_id: int):
     try:
-        roadmap = (
-            session.query(Roadmap)
-            .filter(Roadmap.id == roadmap_id)
-            .first()
+        result = await db.execute(
+            select(Roadmap)
+            .where(Roadmap.id == roadmap_id)
         )
+        roadmap = result.scalars().first()
 
         if not roadmap:
             return None
 
-        roadmap_dict = {
-			"id": roadmap.id,
-            "name": roadmap.name,
-            "slug": roadmap.slug,
-            "description": roadmap.description,
-            "difficulty": roadmap.difficulty
-		}
-        steps = (
-			session.query(RoadmapStepModel)
-			.filter(RoadmapStepModel.roadmap_id == roadmap_id)
-			.order_by(RoadmapStepModel.order_index)
-   			.all()
-    	)
-        roadmap_dict["steps"] = [
-            {
-                "id": step.id,
-				"roadmap_id": step.roadmap_id,
-				"title": step.title,
-				"description": step.description,
-				"topic_slug": step.topic_slug,
-				"order_index": step.order_index,
-				"course_id": step.course_id
-    		} for step in steps]
-
-        return roadmap_dict
+        return await _roadmap_with_steps(db, roadmap)
 
     except Exception as e:
         print("Error fetching roadmap:", e)
         raise e
-    finally:
-        session.close()
         
-def get_roadmap_by_slug(roadmap_slug: str):
-    try:
-        roadmap = (
-            session.query(Roadmap)
-            .filter(Roadmap.slug == roadmap_slug)
-            .first()
+async def get_roadmap_by_slug(db, roadmap_slug: str):
+    async def load(db):
+        result = await db.execute(
+            select(Roadmap)
+            .where(Roadmap.slug == roadmap_slug)
         )
+        roadmap = result.scalars().first()
 
         if not roadmap:
             return None
 
-        roadmap_dict = {
-			"id": roadmap.id,
-            "name": roadmap.name,
-            "slug": roadmap.slug,
-            "description": roadmap.description,
-            "difficulty": roadmap.difficulty
-		}
-        steps = (
-			session.query(RoadmapStepModel)
-			.filter(RoadmapStepModel.roadmap_id == roadmap.id)
-			.order_by(RoadmapStepModel.order_index)
-   			.all()
-    	)
-        roadmap_dict["steps"] = [
-            {
-                "id": step.id,
-				"roadmap_id": step.roadmap_id,
-				"title": step.title,
-				"description": step.description,
-				"topic_slug": step.topic_slug,
-				"order_index": step.order_index,
-				"course_id": step.course_id
-    		} for step in steps]
-
-        return roadmap_dict
+        return await _roadmap_with_steps(db, roadmap)
+
+    try:
+        return await content_cache.get_or_load(f"roadmap-slug:{roadmap_slug}", load)
     
     except Exception as e:
         print("Error fetching roadmap:", e)
         raise e
-    finally:
-        session.close()
 
-def get_roadmap_steps_by_id(roadmap_id):
+async def _roadmap_with_steps(db, roadmap):
+    roadmap_dict = {
+        "id": roadmap.id,
+        "name": roadmap.name,
+        "slug": roadmap.slug,
+        "description": roadmap.description,
+        "difficulty": roadmap.difficulty
+    }
+    steps = await get_roadmap_steps_by_id(db, roadmap.id)
+    roadmap_dict["steps"] = [
+        {
+            "id": step.id,
+            "roadmap_id": step.roadmap_id,
+            "title": step.title,
+            "description": step.description,
+            "topic_slug": step.topic_slug,
+            "order_index": step.order_index,
+            "course_id": step.course_id
+        } for step in steps]
+
+    return roadmap_dict
+
+def roadmap_steps_query(roadmap_id):
+    return (
+        select(RoadmapStepModel)
+        .where(RoadmapStepModel.roadmap_id == roadmap_id)
+        .order_by(RoadmapStepModel.order_index)
+    )
+
+async def get_roadmap_steps_by_id(db, roadmap_id):
     try:
-        roadmap = (
-			session.query(RoadmapStepModel)
-			.filter(RoadmapStepModel.roadmap_id == roadmap_id)
-			.order_by(RoadmapStepModel.order_index)
-   			.all()
-    	)
+        result = await db.execute(roadmap_steps_query(roadmap_id))
+        roadmap = result.scalars().all()
         return roadmap
     
 
     except Exception as e:
-        raise e
\ No newline at end of file
+        raise e
@@ -0,0 +1,163 @@
+import asyncio
+
+from sqlalchemy import select, insert, update, func, literal
+
+from .models import Course, Chapter, Section, SearchDocument
+from app.core.config import SEARCH_BACKEND
+from app.utils.search_index import InvertedIndex, snippet
+
+SEARCH_LANGUAGE = "english"
+HEADLINE_OPTIONS = "MaxWords=35, MinWords=15, MaxFragments=1"
+# Rows read per round trip when loading the in-memory index
+MEMORY_SYNC_BATCH = 5000
+DOCUMENT_COLUMNS = ["kind", "course_id", "chapter_id", "title", "body"]
+
+memory_index = InvertedIndex()
+_memory_sync_lock = asyncio.Lock()
+
+
+def search_backend(db) -> str:
+    if SEARCH_BACKEND != "auto":
+        return SEARCH_BACKEND
+    return "postgres" if db.get_bind().dialect.name == "postgresql" else "memory"
+
+
+async def _fill_search_vectors(db, course_id):
+    """
+    Compute the tsvector of the course's documents inserted in this
+    transaction (title weighted A, body B). A no-op off Postgres.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    await db.execute(search_vectors_update(course_id))
+
+
+def search_vectors_update(course_id):
+    """UPDATE filling the missing tsvectors of a course's documents (Postgres only)."""
+    vector = func.setweight(func.to_tsvector(SEARCH_LANGUAGE, func.coalesce(SearchDocument.title, "")), "A").op("||")(
+        func.setweight(func.to_tsvector(SEARCH_LANGUAGE, func.coalesce(SearchDocument.body, "")), "B")
+    )
+    return (
+        update(SearchDocument)
+        .where(SearchDocument.course_id == course_id, SearchDocument.search_vector.is_(None))
+        .values(search_vector=vector)
+    )
+
+
+async def index_course(db, course_id):
+    """Add the search document of a course. Runs inside the caller's transaction."""
+    await db.execute(insert(SearchDocument).from_select(
+        DOCUMENT_COLUMNS,
+        select(literal("course"), Course.id, literal(None), Course.title, Course.description)
+        .where(Course.id == course_id)
+    ))
+    await _fill_search_vectors(db, course_id)
+
+
+async def index_chapters(db, course_id, chapter_id=None):
+    """
+    Add the search documents of one chapter, or of every chapter of the
+    course when chapter_id is None. Runs inside the caller's transaction.
+    """
+    query = (
+        select(literal("chapter"), Chapter.course_id, Chapter.id, Chapter.title, Chapter.description)
+        .where(Chapter.course_id == course_id)
+    )
+    if chapter_id is not None:
+        query = query.where(Chapter.id == chapter_id)
+    await db.execute(insert(SearchDocument).from_select(DOCUMENT_COLUMNS, query))
+    await _fill_search_vectors(db, course_id)
+
+
+async def index_sections(db, course_id, chapter_id):
+    """Add the search documents of a chapter's sections. Runs inside the caller's transaction."""
+    await db.execute(insert(SearchDocument).from_select(
+        DOCUMENT_COLUMNS,
+        select(literal("section"), literal(course_id), Section.chapter_id, Section.title, Section.content)
+        .where(Section.chapter_id == chapter_id)
+    ))
+    await _fill_search_vectors(db, course_id)
+
+
+async def _search_postgres(db, query, kind, limit, offset):
+    tsquery = func.websearch_to_tsquery(SEARCH_LANGUAGE, query)
+    rank = func.ts_rank_cd(SearchDocument.search_vector, tsquery)
+    page_query = (
+        select(SearchDocument.id, rank.label("rank"))
+        .where(SearchDocument.search_vector.op("@@")(tsquery))
+        .order_by(rank.desc(), SearchDocument.id)
+        .limit(limit + 1)
+        .offset(offset)
+    )
+    if kind:
+        page_query = page_query.where(SearchDocument.kind == kind)
+    page = page_query.subquery()
+
+    # ts_headline re-parses the body, so it only runs on the rows of this page
+    result = await db.execute(
+        select(
+            SearchDocument.kind, SearchDocument.course_id, SearchDocument.chapter_id, SearchDocument.title,
+            func.ts_headline(SEARCH_LANGUAGE, SearchDocument.body, tsquery, HEADLINE_OPTIONS).label("snippet"),
+            page.c.rank
+        )
+        .join(page, page.c.id == SearchDocument.id)
+        .order_by(page.c.rank.desc(), SearchDocument.id)
+    )
+    rows = [dict(row) for row in result.mappings().all()]
+    return rows[:limit], len(rows) > limit
+
+
+async def sync_memory_index(db):
+    """Load the documents added since the last sync into the in-memory index."""
+    async with _memory_sync_lock:
+        while True:
+            result = await db.execute(
+                select(SearchDocument.id, SearchDocument.kind, SearchDocument.title, SearchDocument.body)
+                .where(SearchDocument.id > memory_index.last_id)
+                .order_by(SearchDocument.id)
+                .limit(MEMORY_SYNC_BATCH)
+            )
+            rows = result.all()
+            for row in rows:
+                memory_index.add(row.id, row.kind, row.title, row.body)
+            if len(rows) < MEMORY_SYNC_BATCH:
+                return
+
+
+async def _search_memory(db, query, kind, limit, offset):
+    await sync_memory_index(db)
+    page, has_more = memory_index.search(query, kind, limit, offset)
+    if not page:
+        return [], False
+    result = await db.execute(
+        select(SearchDocument.id, SearchDocument.kind, SearchDocument.course_id, SearchDocument.chapter_id,
+               SearchDocument.title, SearchDocument.body)
+        .where(SearchDocument.id.in_([doc_id for doc_id, _ in page]))
+    )
+    documents = {row.id: row for row in result.all()}
+    rows = []
+    # Documents deleted since they were indexed (course deleted) drop out here
+    for doc_id, score in page:
+        document = documents.get(doc_id)
+        if document is None:
+            continue
+        rows.append({
+            "kind": document.kind,
+            "course_id": document.course_id,
+            "chapter_id": document.chapter_id,
+            "title": document.title,
+            "snippet": snippet(document.body, query),
+            "rank": score,
+        })
+    return rows, has_more
+
+
+async def search_documents(db, query: str, kind: str = None, limit: int = 20, offset: int = 0):
+    """
+    One page of courses, chapters and sections matching every word of
+    `query`, best match first. Postgres ranks its GIN-indexed tsvectors;
+    other databases use the in-memory inverted index. Returns (rows, has_more).
+    """
+    if search_backend(db) == "postgres":
+        return await _search_postgres(db, query, kind, limit, offset)
+    return await _search_memory(db, query, kind, limit, offset)
@@ -1,39 +1,186 @@
-from fastapi import HTTPException
-from .db import session
+from sqlalchemy import select, case, func, tuple_, cast, Float
+from sqlalchemy.dialects import postgresql, sqlite
 from app.schemas.userProgress import UserProgressRequest
-from app.db.models import UserProgress
+from app.db.models import UserProgress, CourseProgressSummary, Course
 from datetime import datetime
-def save_progress(progress: UserProgressRequest):
+
+# Dialects with INSERT ... ON CONFLICT DO UPDATE
+UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+async def _upsert_progress(db, progress_items):
+    """
+    Insert or update the progress rows in a single INSERT ... ON CONFLICT
+    (user_id, course_id, chapter_id) DO UPDATE ... RETURNING statement.
+    Does not commit.
+    """
+    # One statement may not update the same row twice: the last item for a chapter wins
+    latest = {}
+    for progress in progress_items:
+        latest[(progress.user_id, progress.course_id, progress.chapter_id)] = progress
+    now = datetime.now()
+    rows = [
+        {
+            "user_id": progress.user_id,
+            "course_id": progress.course_id,
+            "chapter_id": progress.chapter_id,
+            "status": progress.status,
+            "completed_at": now,
+            "updated_at": now
+        }
+        for progress in latest.values()
+    ]
+
+    insert = UPSERT_INSERTS[db.get_bind().dialect.name]
+    statement = insert(UserProgress).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=[UserProgress.user_id, UserProgress.course_id, UserProgress.chapter_id],
+        set_={
+            "status": statement.excluded.status,
+            # Re-saving a completed chapter keeps the time it was first completed
+            "completed_at": case(
+                (UserProgress.status.is_(True), UserProgress.completed_at),
+                else_=statement.excluded.completed_at
+            ),
+            "updated_at": statement.excluded.updated_at
+        }
+    ).returning(UserProgress)
+    result = await db.scalars(statement, execution_options={"populate_existing": True})
+    saved = result.all()
+    await _refresh_progress_summaries(db, {(row.user_id, row.course_id) for row in saved})
+    return saved
+
+
+def progress_summaries_query(user_courses):
+    """The summary columns of the given (user_id, course_id) pairs, counted from user_progress."""
+    completed = func.count().filter(UserProgress.status.is_(True))
+    total = func.coalesce(Course.total_chapters, 0)
+    percent = case(
+        (total <= 0, 0.0),
+        (completed >= total, 100.0),
+        else_=100.0 * cast(completed, Float) / total
+    )
+    return (
+        select(
+            UserProgress.user_id, UserProgress.course_id, completed, total, percent,
+            func.max(UserProgress.updated_at)
+        )
+        .join(Course, Course.id == UserProgress.course_id)
+        .where(tuple_(UserProgress.user_id, UserProgress.course_id).in_(list(user_courses)))
+        .group_by(UserProgress.user_id, UserProgress.course_id, Course.total_chapters)
+    )
+
+
+async def _refresh_progress_summaries(db, user_courses):
+    """
+    Recount the course_progress_summaries rows of the given (user_id,
+    course_id) pairs from user_progress, in one INSERT ... SELECT ... ON
+    CONFLICT DO UPDATE. Recounting rather than incrementing keeps the rollup
+    exact when a chapter is saved twice or marked incomplete. Does not commit.
+
+    The summary rows are created if missing and locked first, so a concurrent
+    save of the same course waits for this transaction and its recount (a new
+    statement under READ COMMITTED) then sees the rows committed here.
+    """
+    if not user_courses:
+        return
+    keys = sorted(user_courses)
+    insert = UPSERT_INSERTS[db.get_bind().dialect.name]
+    await db.execute(
+        insert(CourseProgressSummary)
+        .values([{"user_id": user_id, "course_id": course_id} for user_id, course_id in keys])
+        .on_conflict_do_nothing(index_elements=[CourseProgressSummary.user_id, CourseProgressSummary.course_id])
+    )
+    # Locked in key order so two batches over overlapping courses cannot deadlock
+    await db.execute(
+        select(CourseProgressSummary.user_id)
+        .where(tuple_(CourseProgressSummary.user_id, CourseProgressSummary.course_id).in_(keys))
+        .order_by(CourseProgressSummary.user_id, CourseProgressSummary.course_id)
+        .with_for_update()
+    )
+
+    statement = insert(CourseProgressSummary).from_select(
+        ["user_id", "course_id", "completed_chapters", "total_chapters", "percent_complete", "last_activity_at"],
+        progress_summaries_query(keys)
+    )
+    await db.execute(statement.on_conflict_do_update(
+        index_elements=[CourseProgressSummary.user_id, CourseProgressSummary.course_id],
+        set_={
+            "completed_chapters": statement.excluded.completed_chapters,
+            "total_chapters": statement.excluded.total_chapters,
+            "percent_complete": statement.excluded.percent_complete,
+            "last_activity_at": statement.excluded.last_activity_at
+        }
+    ))
+
+
+async def save_progress(db, progress: UserProgressRequest):
+    """
+    Record a chapter's progress in one round trip; saving the same chapter
+    again updates its row instead of failing.
+    """
+    try:
+        saved = await _upsert_progress(db, [progress])
+        await db.commit()
+        return saved[0]
+    except Exception as e:
+        await db.rollback()
+        raise e
+
+
+async def save_progress_batch(db, progress_items):
+    """
+    Record many chapters' progress (e.g. queued by an offline client) in one
+    statement and one transaction. Returns the saved rows.
+    """
     try:
-        exits = session.query(UserProgress).filter(
-            UserProgress.user_id == progress.user_id,
-            UserProgress.course_id == progress.course_id,
-            UserProgress.chapter_id == progress.chapter_id
-            ).first()
-        if exits:
-            raise HTTPException(status_code = 409,detail="record already exits")
-        
-        progress_obj = UserProgress(
-			user_id = progress.user_id,
-			course_id = progress.course_id,
-			chapter_id = progress.chapter_id,
-			status = progress.status,
-			completed_at = datetime.now()
-		)
-        session.add(progress_obj)
-        session.commit()
-        session.refresh(progress_obj)
-        return progress_obj
+        saved = await _upsert_progress(db, progress_items)
+        await db.commit()
+        return saved
     except Exception as e:
-        session.rollback()
+        await db.rollback()
         raise e
 
 
-def get_completed_chapters(user_id,course_id):
-    completed_chapters = session.query(UserProgress).filter(
+def completed_chapters_query(user_id, course_id):
+    return select(UserProgress).where(
         UserProgress.user_id == user_id,
         UserProgress.course_id == course_id
-    ).all()
+    )
+
+
+async def get_completed_chapters(db, user_id,course_id):
+    result = await db.execute(completed_chapters_query(user_id, course_id))
+    completed_chapters = result.scalars().all()
     
     return completed_chapters
 
+
+def progress_dashboard_query(user_id):
+    return (
+        select(
+            CourseProgressSummary.course_id,
+            Course.title,
+            Course.slug,
+            Course.level,
+            CourseProgressSummary.completed_chapters,
+            CourseProgressSummary.total_chapters,
+            CourseProgressSummary.percent_complete,
+            CourseProgressSummary.last_activity_at
+        )
+        .join(Course, Course.id == CourseProgressSummary.course_id)
+        .where(CourseProgressSummary.user_id == user_id)
+        .order_by(CourseProgressSummary.last_activity_at.desc())
+    )
+
+
+async def get_progress_dashboard(db, user_id):
+    """
+    Progress of every course the user has started, most recently active
+    first: one query over the user's summary rows joined to their courses.
+    """
+    result = await db.execute(progress_dashboard_query(user_id))
+    return [dict(row) for row in result.mappings().all()]
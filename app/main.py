@@ -1,15 +1,35 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from .router.course import course_router
 from .router.auth import auth_router
 from .router.userProgress import progress_router
 from .router.roadmap import roadmap_router
+from .router.jobs import job_router
+from .router.metrics import metrics_router
+from .router.search import search_router
+from .services.job_worker import job_worker_pool
+from .utils.password_pool import password_pool
 from app.core.config import setup_cors
-app = FastAPI()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Generation jobs are picked up from the DB by a bounded pool of workers
+    job_worker_pool.start()
+    yield
+    await job_worker_pool.stop()
+    password_pool.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(course_router)
 app.include_router(auth_router)
 app.include_router(progress_router)
 app.include_router(roadmap_router)
+app.include_router(job_router)
+app.include_router(metrics_router)
+app.include_router(search_router)
 
 #cors setup
 setup_cors(app)
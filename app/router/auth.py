@@ -1,16 +1,18 @@
-from fastapi import APIRouter,Response,HTTPException,Body, Request, status
+from fastapi import APIRouter,Response,HTTPException,Body, Request, status, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.db import get_db
 from datetime import timedelta
 from app.utils.email import send_email
-from app.db.auth import generate_otp, verify_user, create_user, create_token, find_user, verify_password
+from app.db.auth import generate_otp, verify_user, create_user, create_token, find_user, authenticate_user, require_user
 from app.schemas.auth import User, UserLogin
 
 auth_router = APIRouter(prefix="/auth")
 
 
 @auth_router.post('/send-otp')
-async def send_otp_handler(email: str = Body(..., embed=True)):
+async def send_otp_handler(email: str = Body(..., embed=True), db: AsyncSession = Depends(get_db)):
     try:
-        otp_obj = generate_otp(email)
+        otp_obj = await generate_otp(db, email)
         send_email(email,otp_obj.otp)
         return Response("Otp Sent")
     except Exception as e:
@@ -18,7 +20,7 @@ async def send_otp_handler(email: str = Body(..., embed=True)):
 
  
 @auth_router.post('/signup')
-async def signup(user: User):
+async def signup(user: User, db: AsyncSession = Depends(get_db)):
 
     if not user.email or not user.username:
         raise HTTPException(status_code=400, detail="Missing required fields")
@@ -30,14 +32,14 @@ async def signup(user: User):
 #            detail="Invalid or expired OTP"
 #        )
     
-    existing_user = find_user(user.email)
+    existing_user = await find_user(db, user.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Email already registered"
         )
 
-    existing_username = find_user(user.username)
+    existing_username = await find_user(db, user.username)
     if existing_username:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -46,7 +48,7 @@ async def signup(user: User):
 
     user_data = user.model_dump(exclude={"otp"})
     try:
-        new_user = create_user(user_data)
+        new_user = await create_user(db, user_data)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -67,14 +69,14 @@ async def signup(user: User):
     
 
 @auth_router.post('/login')
-async def login(request: UserLogin):
+async def login(request: UserLogin, db: AsyncSession = Depends(get_db)):
     
-    user = find_user(request.identifier)
+    user, password_ok = await authenticate_user(db, request.identifier, request.password)
     
     if not user:
         raise HTTPException(status_code=400, detail="User not found")
     
-    if not verify_password(request.password,user.hashed_password):
+    if not password_ok:
         raise HTTPException(
             status_code = 401,
             detail = "Password incorrect"
@@ -91,8 +93,9 @@ async def login(request: UserLogin):
             "user_id":user.id,
             "access_token":access_token
         }
-        
-    
-    
-    
-    
+
+
+@auth_router.get('/me')
+async def me(user: dict = Depends(require_user)):
+    # Resolved from the token through the cached user lookup, without a DB query on repeat requests
+    return user
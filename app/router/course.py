@@ -1,13 +1,17 @@
-from fastapi import APIRouter,Response,HTTPException, Depends,Query
-import asyncio
-
-
-from app.schemas.course import CourseCreateRequest,CourseResponse,ChapterResponse
-from app.db.course import list_courses,get_course,get_chapters,get_sections,get_course_by_slug
-from app.services.course_generation import generate_course_handler
+from fastapi import APIRouter,Response,HTTPException, Depends,Query,Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas.course import CourseCreateRequest,CourseResponse,ChapterResponse,CourseTreeResponse,CoursePage
+from app.db.course import list_courses,get_course,get_chapters,get_course_by_slug,get_course_tree
+from app.db.jobs import enqueue_job, find_course_job_key
+from app.services.course_generation import get_chapter_sections
+from app.schemas.jobs import job_status
+from app.db.db import get_db
 from app.db.auth import require_auth
 from app.db.roadmap import get_roadmap_by_slug
-from app.utils.slug import reverse_slugify
+from app.utils.slug import reverse_slugify, course_job_key
+from app.utils.http_cache import cached_json_response, REVALIDATE
+from app.core.config import HTTP_CACHE_CONTROL, HTTP_LIST_CACHE_CONTROL, LIST_PAGE_SIZE, LIST_MAX_PAGE_SIZE
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -17,50 +21,93 @@ course_router = APIRouter(prefix="/course")
 
 
 @course_router.post('/create')
-async def create(course: CourseCreateRequest):
-    asyncio.create_task(generate_course_handler(course))
-    return {"status":200,"details":'Course Generation Started'}
-
-@course_router.get('/')
-def get_courses():
-    return list_courses()
+async def create(course: CourseCreateRequest, db: AsyncSession = Depends(get_db)):
+    # Requests for the same course while one is queued or running share that job
+    dedup_key = course_job_key(course)
+    job = await enqueue_job(db, "course", course.model_dump(), dedup_key=dedup_key)
+    return {"status":200,"details":'Course Generation Started',"job_id":job.id,"job":job_status(job)}
+
+@course_router.post('/{course_id}/resume')
+async def resume(course_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    Queue the missing chapters of an interrupted generation. Chapters already
+    saved are kept and never regenerated.
+    """
+    course = await get_course(db, course_id)
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+    # Keyed like the job that created the course, so a resume attaches to that job
+    # while it is still running instead of racing it
+    dedup_key = await find_course_job_key(db, course_id) or f"course:{course['slug']}"
+    job = await enqueue_job(db, "course_resume", {"course_id": course_id}, dedup_key=dedup_key)
+    return {"status":200,"details":'Course Generation Resumed',"job_id":job.id,"job":job_status(job)}
+
+@course_router.get('/', response_model=CoursePage)
+async def get_courses(
+    request: Request,
+    limit: int = Query(LIST_PAGE_SIZE, ge=1, le=LIST_MAX_PAGE_SIZE),
+    after: int = Query(None, description="next_cursor of the previous page"),
+    db: AsyncSession = Depends(get_db)
+):
+    items, next_cursor = await list_courses(db, limit, after)
+    return cached_json_response(request, CoursePage(items=items, next_cursor=next_cursor), HTTP_LIST_CACHE_CONTROL)
 
 
 @course_router.get('/{course_id}')
-def get_course_by_id(course_id):
+async def get_course_by_id(course_id: int, request: Request, db: AsyncSession = Depends(get_db)):
     if course_id is None:
         raise HTTPException(status_code=400, detail="course_id cannot be null")
     try:
-        response = get_course(course_id)
+        response = await get_course(db, course_id)
         if not response:
             raise HTTPException(status_code=404, detail="No chapters found for this course")
-        return response
+        return cached_json_response(request, response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
 
+@course_router.get('/{course_slug}/full', response_model=CourseTreeResponse)
+async def get_course_tree_handler(course_slug: str, request: Request, db: AsyncSession = Depends(get_db)):
+    course = await get_course_tree(db, course_slug)
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+    # Still generating, or lazily stored chapters whose sections are not written yet
+    complete = (
+        len(course["chapters"]) >= (course["total_chapters"] or 0)
+        and not any(chapter["sections_status"] == "pending" for chapter in course["chapters"])
+    )
+    return cached_json_response(
+        request,
+        CourseTreeResponse.model_validate(course),
+        HTTP_CACHE_CONTROL if complete else REVALIDATE
+    )
+
+
 @course_router.get('/chapters/{course_id}')
-def get_chapters_by_course(course_id:int):
+async def get_chapters_by_course(course_id:int, request: Request, db: AsyncSession = Depends(get_db)):
     if course_id is None:
         raise HTTPException(status_code=400, detail="course_id cannot be null")
 
     try:
-        response = get_chapters(course_id)
+        response = await get_chapters(db, course_id)
         if not response:
             raise HTTPException(status_code=404, detail="No chapters found for this course")
-        return response
+        # Chapters are appended while the course is being generated
+        return cached_json_response(request, response, HTTP_LIST_CACHE_CONTROL)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
 @course_router.get('/chapters/{chapter_id}/sections')
-def get_sections_by_chapter(chapter_id:int):
+async def get_sections_by_chapter(chapter_id:int, request: Request):
     if chapter_id is None :
         raise HTTPException(status_code=400, detail="chapter_id cannot be null")
     try:
-        response = get_sections(chapter_id)
+        # Uses its own short sessions: a lazily stored chapter is generated here,
+        # and no pooled connection should be held while the LLM runs
+        response = await get_chapter_sections(chapter_id)
         if not response:
             raise HTTPException(status_code=404, detail="No chapters found for this course")
-        return response
+        return cached_json_response(request, response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
     
@@ -68,26 +115,29 @@ def get_sections_by_chapter(chapter_id:int):
 @course_router.get('/get-course-slug/{course_slug}')
 async def get_course_by_slug_handler(
     course_slug: str,
-    roadmap_slug: str = Query(None)
+    request: Request,
+    roadmap_slug: str = Query(None),
+    db: AsyncSession = Depends(get_db)
 ):
     if not course_slug:
         raise HTTPException(status_code=400, detail="course_slug cannot be null")
 
     try:
-        response = get_course_by_slug(course_slug)
+        response = await get_course_by_slug(db, course_slug)
 
         if not response:
             if not roadmap_slug:
                 raise HTTPException(status_code=404, detail="Roadmap slug is required")
 
-            roadmap = get_roadmap_by_slug(roadmap_slug)
+            roadmap = await get_roadmap_by_slug(db, roadmap_slug)
             course = CourseCreateRequest(
                 name=reverse_slugify(course_slug),
-                difficulty=roadmap.get("difficulty")
+                difficulty=roadmap.get("difficulty"),
+                slug=course_slug
             )
-            return await create(course)
+            return await create(course, db)
 
-        return response
+        return cached_json_response(request, response)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
@@ -0,0 +1,90 @@
+import asyncio
+import json
+
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.db import get_db, get_db_session
+from app.schemas.jobs import JobStatusResponse, job_status
+from app.db.jobs import get_job
+from app.utils.events import job_events
+from app.core.config import JOB_EVENTS_POLL_SECONDS
+
+job_router = APIRouter(prefix="/jobs")
+
+TERMINAL_EVENTS = {"succeeded": "completed", "failed": "failed"}
+
+
+@job_router.get("/{job_id}", response_model=JobStatusResponse)
+async def get_job_handler(job_id: int, db: AsyncSession = Depends(get_db)):
+    job = await get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_status(job)
+
+
+def sse_message(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def event_for_change(previous: dict, current: dict) -> str:
+    """
+    Name the change between two polled job snapshots the way the worker
+    names its in-process events.
+    """
+    if current["status"] in TERMINAL_EVENTS:
+        return TERMINAL_EVENTS[current["status"]]
+    if current["status"] == "pending" and previous["status"] == "running":
+        return "retrying"
+    if current["chapters_total"] and not previous["chapters_total"]:
+        return "outline_ready"
+    if current["chapters_done"] > previous["chapters_done"]:
+        return "chapter_persisted"
+    return "progress"
+
+
+@job_router.get("/{job_id}/events")
+async def job_events_handler(job_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    """
+    Server-Sent Events stream of a job: a `status` snapshot first, then
+    outline_ready, chapter_persisted, retrying and finally completed or failed.
+    Every event's data is the same JSON as GET /jobs/{job_id}.
+    """
+    # Subscribe before reading the row so no event can slip in between
+    queue = job_events.subscribe(job_id)
+    job = await get_job(db, job_id)
+    if not job:
+        job_events.unsubscribe(job_id, queue)
+        raise HTTPException(status_code=404, detail="Job not found")
+    snapshot = job_status(job).model_dump(mode="json")
+
+    async def stream():
+        last = snapshot
+        try:
+            yield sse_message("status", last)
+            while last["status"] not in TERMINAL_EVENTS:
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), timeout=JOB_EVENTS_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    # Nothing published here: the job may run in another worker process
+                    async with get_db_session() as db:
+                        polled = await get_job(db, job_id)
+                    if not polled:
+                        return
+                    data = job_status(polled).model_dump(mode="json")
+                    if data == last:
+                        yield ": keep-alive\n\n"
+                        continue
+                    event = event_for_change(last, data)
+                last = data
+                yield sse_message(event, data)
+        finally:
+            job_events.unsubscribe(job_id, queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,19 @@
+from fastapi import APIRouter
+from app.db.db import get_query_cache_stats
+from app.services.llm_cache import llm_cache_stats
+from app.utils.metrics import metrics
+from app.utils.cache import content_cache, user_cache, token_cache
+
+metrics_router = APIRouter(prefix="/metrics")
+
+
+@metrics_router.get("/")
+async def get_metrics():
+    return {
+        "db_query_cache": get_query_cache_stats(),
+        "content_cache": await content_cache.stats(),
+        "user_cache": await user_cache.stats(),
+        "token_cache": token_cache.stats(),
+        "llm_cache": llm_cache_stats(),
+        "structured_output": metrics.get("structured_output"),
+    }
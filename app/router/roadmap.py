@@ -1,26 +1,45 @@
-from fastapi import APIRouter
-from app.schemas.roadmap import RoadmapCreateRequest
-from app.services.roadmap_generation import generate_roadmap_handler
+from fastapi import APIRouter, Depends, Request, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas.roadmap import RoadmapCreateRequest, RoadmapPage
+from app.db.jobs import enqueue_job
+from app.schemas.jobs import job_status
+from app.db.db import get_db
 from app.db.roadmap import get_roadmaps,get_roadmap_by_id,get_roadmap_steps_by_id,get_roadmap_by_slug
+from app.utils.http_cache import cached_json_response
+from app.core.config import HTTP_LIST_CACHE_CONTROL, LIST_PAGE_SIZE, LIST_MAX_PAGE_SIZE
+from slugify import slugify
 roadmap_router = APIRouter(prefix="/roadmap")
 
 @roadmap_router.post("/create")
-def create_roadmap_handler(payload:RoadmapCreateRequest):
-    roadmap = generate_roadmap_handler(payload)
-    return roadmap
+async def create_roadmap_handler(payload:RoadmapCreateRequest, db: AsyncSession = Depends(get_db)):
+    dedup_key = f"roadmap:{slugify(payload.name)}:{slugify(payload.difficulty)}"
+    job = await enqueue_job(db, "roadmap", payload.model_dump(), dedup_key=dedup_key)
+    return {"status":200,"details":'Roadmap Generation Started',"job_id":job.id,"job":job_status(job)}
     
-@roadmap_router.get("/get-roadmaps")
-def get_roadmap_handler():
-    return get_roadmaps()
+@roadmap_router.get("/get-roadmaps", response_model=RoadmapPage)
+async def get_roadmaps_handler(
+    request: Request,
+    limit: int = Query(LIST_PAGE_SIZE, ge=1, le=LIST_MAX_PAGE_SIZE),
+    after: int = Query(None, description="next_cursor of the previous page"),
+    db: AsyncSession = Depends(get_db)
+):
+    items, next_cursor = await get_roadmaps(db, limit, after)
+    return cached_json_response(request, RoadmapPage(items=items, next_cursor=next_cursor), HTTP_LIST_CACHE_CONTROL)
 
 @roadmap_router.get("/get-roadmap/{roadmap_id}")
-def get_roadmap_handler(roadmap_id: int):
-    return get_roadmap_by_id(roadmap_id)
+async def get_roadmap_handler(roadmap_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    roadmap = await get_roadmap_by_id(db, roadmap_id)
+    if roadmap is None:
+        return None
+    return cached_json_response(request, roadmap)
 
 @roadmap_router.get("/get-roadmap-slug/{roadmap_slug}")
-def get_roadmap_slug_handler(roadmap_slug: str):
-    return get_roadmap_by_slug(roadmap_slug)
+async def get_roadmap_slug_handler(roadmap_slug: str, request: Request, db: AsyncSession = Depends(get_db)):
+    roadmap = await get_roadmap_by_slug(db, roadmap_slug)
+    if roadmap is None:
+        return None
+    return cached_json_response(request, roadmap)
 
 @roadmap_router.get("/get-roadmap-steps/{roadmap_id}")
-def get_roadmap_steps_handler(roadmap_id: int):
-    return get_roadmap_steps_by_id(roadmap_id)
\ No newline at end of file
+async def get_roadmap_steps_handler(roadmap_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    return cached_json_response(request, await get_roadmap_steps_by_id(db, roadmap_id))
\ No newline at end of file
@@ -0,0 +1,27 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas.search import SearchPage
+from app.db.db import get_db
+from app.db.search import search_documents
+from app.core.config import LIST_PAGE_SIZE, LIST_MAX_PAGE_SIZE
+
+search_router = APIRouter(prefix="/search")
+
+
+@search_router.get("/", response_model=SearchPage)
+async def search_handler(
+    q: str = Query(..., min_length=1, max_length=200),
+    kind: Literal["course", "chapter", "section"] = Query(None),
+    limit: int = Query(LIST_PAGE_SIZE, ge=1, le=LIST_MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Full-text search over course, chapter and section titles and text, best
+    match first. Words are ANDed; on Postgres quoted phrases, `or` and
+    `-word` work as in websearch_to_tsquery.
+    """
+    items, has_more = await search_documents(db, q, kind, limit, offset)
+    return SearchPage(items=items, next_offset=offset + limit if has_more else None)
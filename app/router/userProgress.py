@@ -1,22 +1,39 @@
-from fastapi import APIRouter,HTTPException,Response
-from app.schemas.userProgress import UserProgressRequest,UserProgressResponse
-from app.db.userProgress import save_progress,get_completed_chapters
+from fastapi import APIRouter,HTTPException,Response,Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.db import get_db
+from typing import List
+from app.schemas.userProgress import UserProgressRequest,UserProgressBatchRequest,UserProgressResponse,CourseProgressSummaryResponse
+from app.db.userProgress import save_progress,save_progress_batch,get_completed_chapters,get_progress_dashboard
 
 progress_router = APIRouter(prefix="/progress")
 
 @progress_router.post("/save",response_model = UserProgressResponse)
-def progress_handler(progress: UserProgressRequest):
+async def progress_handler(progress: UserProgressRequest, db: AsyncSession = Depends(get_db)):
     try:
-        return save_progress(progress)
+        return await save_progress(db, progress)
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error saving progress: {str(e)}")
 
+@progress_router.post("/save-batch",response_model = List[UserProgressResponse])
+async def progress_batch_handler(batch: UserProgressBatchRequest, db: AsyncSession = Depends(get_db)):
+    try:
+        return await save_progress_batch(db, batch.items)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error saving progress: {str(e)}")
+
 @progress_router.get("/get-progress")
-def completed_chapter_handler(user_id:int,course_id:int):
+async def completed_chapter_handler(user_id:int,course_id:int, db: AsyncSession = Depends(get_db)):
     try:
-        chapters = get_completed_chapters(user_id,course_id)
+        chapters = await get_completed_chapters(db, user_id,course_id)
         return chapters
     except Exception as e:
-        raise HTTPException(status_code=500,detail=f"Error fetching progress: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500,detail=f"Error fetching progress: {str(e)}")
+
+@progress_router.get("/dashboard",response_model = List[CourseProgressSummaryResponse])
+async def dashboard_handler(user_id:int, db: AsyncSession = Depends(get_db)):
+    try:
+        return await get_progress_dashboard(db, user_id)
+    except Exception as e:
+        raise HTTPException(status_code=500,detail=f"Error fetching dashboard: {str(e)}")
@@ -53,6 +53,8 @@ class CourseCreateRequest(BaseModel):
     duration: str | None = "1"
     description: str | None = None  # optional
     slug : str | None = None
+    refresh: bool = False  # skip cached LLM responses and generate fresh content
+    lazy: bool | None = None  # only store the outline, expand chapters on first read (default: COURSE_LAZY_CHAPTERS)
 
 class CourseResponse(BaseModel):
     id: int
@@ -62,6 +64,19 @@ class CourseResponse(BaseModel):
     class Config:
         from_attributes = True  # enables conversion from SQLAlchemy model
         
+class CourseSummary(BaseModel):
+    """Listing projection of a course (no description or content)"""
+    id: int
+    title: str
+    slug: Optional[str] = None
+    level: Optional[str] = None
+    total_chapters: Optional[int] = None
+    duration: Optional[int] = None
+
+class CoursePage(BaseModel):
+    items: List[CourseSummary]
+    next_cursor: Optional[int] = Field(default=None, description="Pass as `after` to get the next page; null on the last page")
+
 class ChapterResponse(BaseModel):
     id :int
     chapter_number : int
@@ -69,4 +84,37 @@ class ChapterResponse(BaseModel):
     description : str
     estimated_duration : int
     course_id : int
+    learning_objectives : Optional[List[str]] = None
+    sections_status : Optional[str] = None
+
+class SectionResponse(BaseModel):
+    id: int
+    type: str
+    title: str
+    content: str
+    language: Optional[str] = None
+    explanation: Optional[str] = None
+    chapter_id: int
+
+    class Config:
+        from_attributes = True
+
+class ChapterTreeResponse(ChapterResponse):
+    sections: List[SectionResponse]
+
+    class Config:
+        from_attributes = True
 
+class CourseTreeResponse(BaseModel):
+    """Course with all of its chapters and their sections"""
+    id: int
+    title: str
+    slug: str
+    description: Optional[str] = None
+    level: Optional[str] = None
+    duration: Optional[int] = None
+    total_chapters: Optional[int] = None
+    chapters: List[ChapterTreeResponse]
+
+    class Config:
+        from_attributes = True
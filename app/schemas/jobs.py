@@ -0,0 +1,46 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+
+class JobStatusResponse(BaseModel):
+    id: int
+    kind: str
+    status: str
+    attempts: int
+    max_attempts: int
+    chapters_total: int
+    chapters_done: int
+    progress: float
+    course_id: Optional[int] = None
+    roadmap_id: Optional[int] = None
+    last_error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+def job_status(job):
+    if job.status == "succeeded":
+        progress = 100.0
+    elif job.chapters_total:
+        progress = round(job.chapters_done * 100 / job.chapters_total, 2)
+    else:
+        progress = 0.0
+    return JobStatusResponse(
+        id=job.id,
+        kind=job.kind,
+        status=job.status,
+        attempts=job.attempts,
+        max_attempts=job.max_attempts,
+        chapters_total=job.chapters_total,
+        chapters_done=job.chapters_done,
+        progress=progress,
+        course_id=job.course_id,
+        roadmap_id=job.roadmap_id,
+        last_error=job.last_error,
+        created_at=job.created_at,
+        updated_at=job.updated_at
+    )
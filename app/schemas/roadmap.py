@@ -21,4 +21,17 @@ class RoadmapOutline(BaseModel):
 class RoadmapCreateRequest(BaseModel):
     name: str = Field(..., description="What roadmap should be generated?")
     difficulty: str = Field(..., description="Beginner / Intermediate / Advanced")
+    refresh: bool = Field(False, description="Skip cached LLM responses and generate a fresh roadmap")
 
+
+class RoadmapSummary(BaseModel):
+    """Listing projection of a roadmap (no description or steps)"""
+    id: int
+    name: str
+    slug: str
+    difficulty: Optional[str] = None
+
+
+class RoadmapPage(BaseModel):
+    items: List[RoadmapSummary]
+    next_cursor: Optional[int] = Field(default=None, description="Pass as `after` to get the next page; null on the last page")
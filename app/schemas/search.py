@@ -0,0 +1,16 @@
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+
+
+class SearchResult(BaseModel):
+    kind: Literal["course", "chapter", "section"]
+    course_id: int
+    chapter_id: Optional[int] = None
+    title: Optional[str] = None
+    snippet: Optional[str] = Field(default=None, description="Matching excerpt, query terms wrapped in <b></b>")
+    rank: float
+
+
+class SearchPage(BaseModel):
+    items: List[SearchResult]
+    next_offset: Optional[int] = Field(default=None, description="Pass as `offset` to get the next page; null on the last page")
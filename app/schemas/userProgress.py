@@ -1,7 +1,9 @@
 from pydantic import BaseModel,Field
 import json
+from datetime import datetime
 from enum import Enum
 from typing import List, Dict, Any, Optional
+from app.core.config import PROGRESS_BATCH_MAX_ITEMS
 
 
 class UserProgressRequest(BaseModel):
@@ -9,10 +11,20 @@ class UserProgressRequest(BaseModel):
     course_id: int
     chapter_id: int
     status: bool
+class UserProgressBatchRequest(BaseModel):
+    items: List[UserProgressRequest] = Field(..., min_length=1, max_length=PROGRESS_BATCH_MAX_ITEMS)
 class UserProgressResponse(BaseModel):
     id : int
     user_id: int
     course_id: int
     chapter_id: int
     status: bool
-    
\ No newline at end of file
+class CourseProgressSummaryResponse(BaseModel):
+    course_id: int
+    title: Optional[str] = None
+    slug: Optional[str] = None
+    level: Optional[str] = None
+    completed_chapters: int
+    total_chapters: int
+    percent_complete: float
+    last_activity_at: Optional[datetime] = None
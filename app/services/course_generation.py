@@ -1,25 +1,33 @@
-from langchain_groq import ChatGroq
 from langchain_core.prompts import ChatPromptTemplate
 from langchain.output_parsers import PydanticOutputParser
 from langchain.output_parsers import OutputFixingParser
 
 
 import asyncio
+import json
+from sqlalchemy.exc import IntegrityError
+from slugify import slugify
 
-from app.schemas.course import CourseOutline,DetailedChapter
-from app.db.course import create_course,create_chapter
+from app.schemas.course import CourseOutline,DetailedChapter,Chapter
+from app.db.course import (
+    create_course, create_chapter, get_course_by_slug, get_course_checkpoint, mark_course_complete,
+    create_outline_chapters, add_chapter_sections, get_chapter, get_chapters, get_sections
+)
+from app.db.db import get_db_session
+from app.core.config import CHAPTER_CONCURRENCY, LLM_COMPLETION_TOKEN_ESTIMATE, COURSE_LAZY_CHAPTERS, LLM_JSON_MODE
+from app.services.llm_cache import cached_llm_call
+from app.services.llm_providers import get_llm
+from app.utils.json_repair import repair_json
+from app.utils.metrics import metrics
+from app.utils.rate_limiter import llm_rate_limiter, estimate_tokens
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
-llm = ChatGroq(
-        temperature=0.3,
-        model_name="openai/gpt-oss-20b",
-        max_tokens=4000
-    )
+llm = get_llm()
 
 
-def generate_course_outline(name, target_audiunce="Beginner", difficulty="Easy", duration="2"):
+async def generate_course_outline(name, target_audiunce="Beginner", difficulty="Easy", duration="2", use_cache=True):
     logger.info(f"Generating course outline for topic='{name}', audience='{target_audiunce}', "
                 f"difficulty='{difficulty}', duration={duration} months")
 
@@ -46,20 +54,58 @@ def generate_course_outline(name, target_audiunce="Beginner", difficulty="Easy",
     ])
 
     chain = prompt_template | llm_chain
-
-    result = chain.invoke({
+    inputs = {
         "course_topic": name,
         "target_audience": target_audiunce,
         "difficulty_level": difficulty,
         "course_duration": duration
-    })
-    
+    }
+
+    async def invoke():
+        await llm_rate_limiter.acquire(
+            estimate_tokens(name, target_audiunce, difficulty) + LLM_COMPLETION_TOKEN_ESTIMATE
+        )
+        return await chain.ainvoke(inputs)
+
+    result = await cached_llm_call("course_outline", llm, prompt_template, inputs, CourseOutline, invoke, use_cache)
 
     logger.info(f"Generated course outline with {len(result.chapters)} chapters")
     return result
 
 
-def generate_chapter_content(chapter):
+async def parse_structured_output(text, parser):
+    """
+    Parse LLM text into the parser's pydantic model, cheapest tier first:
+    direct parse, local JSON repair (fences, bad escapes, truncation), and only
+    then OutputFixingParser, which costs another LLM call. The tier used is
+    counted under "structured_output" in /metrics.
+    """
+    try:
+        result = parser.parse(text)
+        metrics.incr("structured_output", "direct")
+        return result
+    except Exception as e:
+        logger.warning(f"Parser failed, attempting local repair: {e}")
+
+    try:
+        result = parser.pydantic_object.model_validate(json.loads(repair_json(text), strict=False))
+        metrics.incr("structured_output", "repaired")
+        return result
+    except Exception as e:
+        logger.warning(f"Local repair failed, falling back to the LLM fixer: {e}")
+
+    await llm_rate_limiter.acquire(estimate_tokens(text) + LLM_COMPLETION_TOKEN_ESTIMATE)
+    fixing_parser = OutputFixingParser.from_llm(parser=parser, llm=llm)
+    try:
+        result = await fixing_parser.aparse(text)
+    except Exception:
+        metrics.incr("structured_output", "failed")
+        raise
+    metrics.incr("structured_output", "llm_fixer")
+    return result
+
+
+async def generate_chapter_content(chapter, use_cache=True):
     logger.info(f"Expanding chapter {chapter.chapter_number}: '{chapter.title}'")
     
     parser = PydanticOutputParser(pydantic_object=DetailedChapter)
@@ -93,61 +139,229 @@ def generate_chapter_content(chapter):
         """)
     ]).partial(format_instructions=parser.get_format_instructions())
     
-    # Option 1: Use the chain with parser directly and handle errors manually
-    try:
-        chain = prompt_template | llm | parser
-        result = chain.invoke({
-            "chapter_number": chapter.chapter_number,
-            "chapter_title": chapter.title,
-            "chapter_description": chapter.description,
-            "learning_objectives": chapter.learning_objectives,
-            "estimated_duration": chapter.estimated_duration
-        })
-    except Exception as e:
-        logger.warning(f"Parser failed, attempting to fix: {e}")
-        # If parsing fails, use OutputFixingParser
-        fixing_parser = OutputFixingParser.from_llm(parser=parser, llm=llm)
-        # Get the raw LLM output first
-        chain_without_parser = prompt_template | llm
-        raw_output = chain_without_parser.invoke({
-            "chapter_number": chapter.chapter_number,
-            "chapter_title": chapter.title,
-            "chapter_description": chapter.description,
-            "learning_objectives": chapter.learning_objectives,
-            "estimated_duration": chapter.estimated_duration
-        })
-        # Now pass the string to the fixing parser
-        result = fixing_parser.parse(raw_output.content)
-    
+    inputs = {
+        "chapter_number": chapter.chapter_number,
+        "chapter_title": chapter.title,
+        "chapter_description": chapter.description,
+        "learning_objectives": chapter.learning_objectives,
+        "estimated_duration": chapter.estimated_duration
+    }
+
+    async def invoke():
+        await llm_rate_limiter.acquire(
+            estimate_tokens(chapter.title, chapter.description, chapter.learning_objectives)
+            + LLM_COMPLETION_TOKEN_ESTIMATE
+        )
+        # One LLM call; the raw text is kept so a parse failure never re-runs the chain
+        chat_model = llm.bind(response_format={"type": "json_object"}) if LLM_JSON_MODE else llm
+        raw_output = await (prompt_template | chat_model).ainvoke(inputs)
+        return await parse_structured_output(raw_output.content, parser)
+
+    result = await cached_llm_call("chapter_content", llm, prompt_template, inputs, DetailedChapter, invoke, use_cache)
     logger.info(f"Generated chapter content with {len(result.sections)} sections")
     return result
 
 
-async def generate_course_handler(course):
+async def expand_chapter(chapter, semaphore, use_cache=True):
+    """
+    Expand a single chapter once a concurrency slot is free. Rate limit quota
+    is only taken when the response is not already cached.
+    """
+    async with semaphore:
+        return await generate_chapter_content(chapter, use_cache)
+
+
+async def expand_and_persist_chapters(course_id, outline, done_numbers, on_progress=None, use_cache=True):
+    """
+    Expand the outline chapters whose numbers are not in `done_numbers` and
+    persist them. Each create_chapter commit is the checkpoint for that chapter,
+    so a rerun after a crash only pays for the chapters still missing.
+    """
+    # Expand chapters concurrently, throttled by the shared rate limiter
+    semaphore = asyncio.Semaphore(CHAPTER_CONCURRENCY)
+    chapters = sorted(
+        (chapter for chapter in outline.chapters if chapter.chapter_number not in done_numbers),
+        key=lambda chapter: chapter.chapter_number
+    )
+    tasks = [asyncio.create_task(expand_chapter(chapter, semaphore, use_cache)) for chapter in chapters]
+
+    try:
+        # Persist in chapter_number order as soon as each chapter (and all before it) is ready
+        for done, (chapter, task) in enumerate(zip(chapters, tasks), start=len(done_numbers) + 1):
+            chapter_content = await task
+            try:
+                async with get_db_session() as db:
+                    await create_chapter(db, course_id, chapter, chapter_content)
+                logger.info(f"Saved chapter {chapter.chapter_number} ('{chapter.title}') to DB")
+            except IntegrityError:
+                # The unique (course_id, chapter_number) index rejected it: another job stored it first
+                logger.info(f"Chapter {chapter.chapter_number} of course id={course_id} was saved by another job")
+            if on_progress:
+                await on_progress(chapters_done=done)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    async with get_db_session() as db:
+        await mark_course_complete(db, course_id)
+
+
+async def resume_course_generation(course_id, on_progress=None, use_cache=True):
+    """
+    Finish a partially generated course from its checkpoint: only chapters of
+    the stored outline that are not persisted yet are sent to the LLM.
+    """
+    async with get_db_session() as db:
+        checkpoint, done_numbers = await get_course_checkpoint(db, course_id)
+
+    if not checkpoint or checkpoint.status == "complete":
+        logger.info(f"Course id={course_id} has nothing left to generate")
+        if on_progress:
+            await on_progress(course_id=course_id)
+        return course_id
+
+    outline = CourseOutline.model_validate(checkpoint.outline)
+    logger.info(f"Resuming course id={course_id}: {len(done_numbers)}/{len(outline.chapters)} chapters already saved")
+    if on_progress:
+        await on_progress(course_id=course_id, chapters_total=len(outline.chapters), chapters_done=len(done_numbers))
+
+    await expand_and_persist_chapters(course_id, outline, done_numbers, on_progress, use_cache)
+    logger.info(f"Course generation resumed and completed for id={course_id}")
+    return course_id
+
+
+async def generate_course_handler(course, on_progress=None):
+    """
+    Generate and persist a full course. `on_progress` is an optional coroutine
+    called with progress fields (course_id, chapters_total, chapters_done).
+    Returns the course id.
+    """
     logger.info(f"Starting course generation for: {course.name}")
+    use_cache = not course.refresh
+
+    if course.slug:
+        # A previous job for this slug may have created the course already
+        # (finished, or interrupted part way): continue it instead of starting over
+        async with get_db_session() as db:
+            existing = await get_course_by_slug(db, course.slug)
+        if existing:
+            return await resume_course_generation(existing["id"], on_progress, use_cache)
 
     # Step 1: Generate course outline
-    result = generate_course_outline(
+    result = await generate_course_outline(
         course.name,
         course.target_audiunce,
         course.difficulty,
         course.duration,
+        use_cache=use_cache,
     )
-    # Step 2: Save course to DB
-    course_obj = create_course(result)
+    if not course.slug:
+        # A repeated request gets the same (cached) outline, so the course it
+        # created before is stored under the slug of this title
+        async with get_db_session() as db:
+            existing = await get_course_by_slug(db, slugify(result.course_title))
+        if existing:
+            return await resume_course_generation(existing["id"], on_progress, use_cache)
+
+    # Step 2: Save course and its outline checkpoint to DB
+    async with get_db_session() as db:
+        course_obj = await create_course(db, result, slug=course.slug)
     logger.info(f"Saved course '{course_obj.title}' with id={course_obj.id} to DB")
+    if on_progress:
+        await on_progress(course_id=course_obj.id, chapters_total=len(result.chapters), chapters_done=0)
 
-    # Step 3: Expand and save chapters with throttling
-    for i, chapter in enumerate(result.chapters, start=1):
-        chapter_content = generate_chapter_content(chapter)
-        create_chapter(course_obj.id, chapter, chapter_content)
-        logger.info(f"Saved chapter {chapter.chapter_number} ('{chapter.title}') to DB")
+    # Step 3: Expand and persist every chapter, or in lazy mode only the outline
+    lazy = course.lazy if course.lazy is not None else COURSE_LAZY_CHAPTERS
+    if lazy:
+        async with get_db_session() as db:
+            await create_outline_chapters(db, course_obj.id, result.chapters)
+            await mark_course_complete(db, course_obj.id)
+        logger.info(f"Stored outline of '{course_obj.title}', chapters are expanded on first read")
+        if on_progress:
+            await on_progress(chapters_done=len(result.chapters))
+        return course_obj.id
 
-            
-        # Rate limit: 3 chapters/minute → wait 20s after each chapter
-        logger.info("Waiting 20s before next chapter...")
-        await asyncio.sleep(20)  # spread out within the minute
+    await expand_and_persist_chapters(course_obj.id, result, set(), on_progress, use_cache)
 
     logger.info(f"Course generation complete for: {course.name}")
-    return course_obj
+    return course_obj.id
+
+
+# chapter id -> task storing its sections in this process, shared by first reads and prefetch
+_section_fills = {}
+# Keeps fire-and-forget prefetch tasks referenced until they finish
+_prefetch_tasks = set()
+
+
+async def _fill_chapter_sections(chapter: dict):
+    outline_chapter = Chapter(
+        chapter_number=chapter["chapter_number"],
+        title=chapter["title"],
+        description=chapter["description"] or "",
+        learning_objectives=chapter["learning_objectives"] or [],
+        estimated_duration=chapter["estimated_duration"] or 0
+    )
+    chapter_content = await generate_chapter_content(outline_chapter)
+    async with get_db_session() as db:
+        stored = await add_chapter_sections(db, chapter["id"], chapter_content)
+    if stored:
+        logger.info(f"Saved lazily generated chapter id={chapter['id']} ('{chapter['title']}')")
+    else:
+        logger.info(f"Chapter id={chapter['id']} was expanded by another worker first")
+
+
+async def generate_chapter_sections(chapter: dict):
+    """
+    Expand a pending chapter once per process, however many readers ask at once.
+    Across workers the conditional update in add_chapter_sections keeps one result.
+    """
+    task = _section_fills.get(chapter["id"])
+    if task is None:
+        task = asyncio.create_task(_fill_chapter_sections(chapter))
+        _section_fills[chapter["id"]] = task
+        task.add_done_callback(lambda _: _section_fills.pop(chapter["id"], None))
+    # Shielded so a reader disconnecting does not cancel the fill for everyone else
+    await asyncio.shield(task)
+
+
+def prefetch_next_chapter(chapter: dict):
+    """
+    Start expanding the chapter after `chapter` in the background if it is still
+    pending, so it is usually ready by the time the learner opens it.
+    """
+    async def prefetch():
+        try:
+            async with get_db_session() as db:
+                chapters = await get_chapters(db, chapter["course_id"])
+            following = sorted(
+                (item for item in chapters if item["chapter_number"] > chapter["chapter_number"]),
+                key=lambda item: item["chapter_number"]
+            )
+            if following and following[0]["sections_status"] == "pending":
+                await generate_chapter_sections(following[0])
+        except Exception as e:
+            logger.warning(f"Prefetch after chapter id={chapter['id']} failed: {str(e)}")
+
+    task = asyncio.create_task(prefetch())
+    _prefetch_tasks.add(task)
+    task.add_done_callback(_prefetch_tasks.discard)
+
+
+async def get_chapter_sections(chapter_id):
+    """
+    Sections of a chapter, generating them first if the chapter was stored
+    lazily and this is its first read.
+    """
+    async with get_db_session() as db:
+        chapter = await get_chapter(db, chapter_id)
+        if not chapter:
+            return []
+        sections = await get_sections(db, chapter_id)
+
+    if not sections and chapter["sections_status"] == "pending":
+        await generate_chapter_sections(chapter)
+        async with get_db_session() as db:
+            sections = await get_sections(db, chapter_id)
 
+    prefetch_next_chapter(chapter)
+    return sections
@@ -0,0 +1,136 @@
+import asyncio
+import os
+import socket
+
+from app.core.config import JOB_WORKER_CONCURRENCY, JOB_POLL_INTERVAL_SECONDS
+from app.db.db import get_db_session
+from app.db.jobs import claim_job, complete_job, fail_job, release_job, update_job_progress
+from app.schemas.course import CourseCreateRequest
+from app.schemas.jobs import job_status
+from app.schemas.roadmap import RoadmapCreateRequest
+from app.services.course_generation import generate_course_handler, resume_course_generation
+from app.services.roadmap_generation import generate_roadmap_handler
+from app.utils.events import job_events
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def publish_job_event(event: str, job):
+    if job:
+        job_events.publish(job.id, event, job_status(job).model_dump(mode="json"))
+
+
+def job_progress_callback(job):
+    """
+    `on_progress` for the course generation functions: records the fields on
+    the job row and publishes the matching event to SSE subscribers.
+    """
+    async def on_progress(**fields):
+        async with get_db_session() as db:
+            updated = await update_job_progress(db, job.id, **fields)
+        if "chapters_total" in fields:
+            publish_job_event("outline_ready", updated)
+        elif "chapters_done" in fields:
+            publish_job_event("chapter_persisted", updated)
+        else:
+            publish_job_event("progress", updated)
+
+    return on_progress
+
+
+async def run_course_job(job):
+    course = CourseCreateRequest(**job.payload)
+    on_progress = job_progress_callback(job)
+    if job.course_id:
+        # A previous attempt already stored the course: pick up where it stopped
+        await resume_course_generation(job.course_id, on_progress=on_progress, use_cache=not course.refresh)
+    else:
+        await generate_course_handler(course, on_progress=on_progress)
+
+
+async def run_course_resume_job(job):
+    await resume_course_generation(job.payload["course_id"], on_progress=job_progress_callback(job))
+
+
+async def run_roadmap_job(job):
+    payload = RoadmapCreateRequest(**job.payload)
+    roadmap = await generate_roadmap_handler(payload)
+    async with get_db_session() as db:
+        updated = await update_job_progress(db, job.id, roadmap_id=roadmap.id)
+    publish_job_event("progress", updated)
+
+
+JOB_HANDLERS = {
+    "course": run_course_job,
+    "course_resume": run_course_resume_job,
+    "roadmap": run_roadmap_job,
+}
+
+
+class JobWorkerPool:
+    """
+    Runs `concurrency` worker loops on the event loop. Each loop claims one job
+    at a time from the generation_jobs table, so at most `concurrency` generations
+    run per process no matter how many requests come in.
+    """
+
+    def __init__(self, concurrency: int = JOB_WORKER_CONCURRENCY, poll_interval: float = JOB_POLL_INTERVAL_SECONDS):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self._tasks = []
+
+    def start(self):
+        logger.info(f"Starting {self.concurrency} generation job workers")
+        self._tasks = [
+            asyncio.create_task(self._worker_loop(f"{self.worker_prefix}:{i}"))
+            for i in range(self.concurrency)
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker_loop(self, worker_id: str):
+        while True:
+            try:
+                async with get_db_session() as db:
+                    job = await claim_job(db, worker_id)
+            except Exception as e:
+                logger.error(f"Worker {worker_id} failed to claim a job: {str(e)}")
+                job = None
+
+            if not job:
+                await asyncio.sleep(self.poll_interval)
+                continue
+
+            await self._run(job, worker_id)
+
+    async def _run(self, job, worker_id: str):
+        handler = JOB_HANDLERS.get(job.kind)
+        logger.info(f"Worker {worker_id} running job id={job.id} kind={job.kind} attempt={job.attempts}")
+        try:
+            if not handler:
+                raise ValueError(f"Unknown job kind '{job.kind}'")
+            await handler(job)
+            async with get_db_session() as db:
+                finished = await complete_job(db, job.id)
+            publish_job_event("completed", finished)
+            logger.info(f"Job id={job.id} completed")
+        except asyncio.CancelledError:
+            # Shutting down: put the job back so another worker picks it up right away
+            logger.info(f"Releasing job id={job.id} on shutdown")
+            async with get_db_session() as db:
+                await release_job(db, job.id)
+            raise
+        except Exception as e:
+            logger.error(f"Job id={job.id} failed: {str(e)}", exc_info=True)
+            async with get_db_session() as db:
+                failed = await fail_job(db, job.id, str(e))
+            publish_job_event("failed" if failed.status == "failed" else "retrying", failed)
+
+
+job_worker_pool = JobWorkerPool()
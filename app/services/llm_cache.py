@@ -0,0 +1,98 @@
+import hashlib
+import json
+
+from app.core.config import LLM_CACHE_ENABLED, LLM_CACHE_TTL_SECONDS
+from app.db.db import get_db_session
+from app.db.llm_cache import get_llm_response, store_llm_response
+from app.utils.metrics import metrics, hit_ratio
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _sha256(value) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def model_id(llm) -> str:
+    """
+    Identity of the model behind a chat model object, part of every cache key.
+    """
+    return getattr(llm, "model_name", None) or getattr(llm, "model", None) or type(llm).__name__
+
+
+def template_hash(prompt_template, schema) -> str:
+    """
+    Hash of the prompt messages, their partial variables and the output schema:
+    editing any of them invalidates the responses cached for the old version.
+    """
+    messages = [
+        [type(message).__name__, getattr(getattr(message, "prompt", None), "template", str(message))]
+        for message in prompt_template.messages
+    ]
+    partials = {key: str(value) for key, value in prompt_template.partial_variables.items()}
+    return _sha256([messages, partials, schema.model_json_schema()])
+
+
+def normalize_inputs(value):
+    """
+    Case and whitespace insensitive view of the prompt inputs, so
+    "Python  Basics" and "python basics" share one cache entry.
+    """
+    if isinstance(value, dict):
+        return {key: normalize_inputs(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize_inputs(item) for item in value]
+    if value is None:
+        return None
+    return " ".join(str(value).split()).lower()
+
+
+async def cached_llm_call(kind: str, llm, prompt_template, inputs: dict, schema, invoke, use_cache: bool = True):
+    """
+    Return the `schema` instance cached for this model, template and inputs,
+    or await `invoke()` (which runs the chain) and store its result.
+
+    `use_cache=False` (or LLM_CACHE_ENABLED=false) skips the lookup but still
+    stores the fresh result. Cache errors never fail a generation.
+    """
+    model = model_id(llm)
+    prompt_hash = template_hash(prompt_template, schema)
+    key = _sha256([model, prompt_hash, normalize_inputs(inputs)])
+
+    if use_cache and LLM_CACHE_ENABLED:
+        try:
+            async with get_db_session() as db:
+                cached = await get_llm_response(db, key)
+        except Exception as e:
+            logger.warning(f"LLM cache lookup failed for {kind}: {str(e)}")
+            cached = None
+        if cached is not None:
+            metrics.incr("llm_cache", "hit")
+            logger.info(f"LLM cache hit for {kind} ({key[:12]})")
+            return schema.model_validate(cached)
+        metrics.incr("llm_cache", "miss")
+    else:
+        metrics.incr("llm_cache", "bypass")
+
+    result = await invoke()
+
+    try:
+        async with get_db_session() as db:
+            await store_llm_response(db, key, kind, model, prompt_hash, result.model_dump(mode="json"),
+                                     LLM_CACHE_TTL_SECONDS)
+    except Exception as e:
+        logger.warning(f"LLM cache store failed for {kind}: {str(e)}")
+    return result
+
+
+def llm_cache_stats():
+    counters = metrics.get("llm_cache")
+    hits = counters.get("hit", 0)
+    misses = counters.get("miss", 0)
+    return {
+        "hits": hits,
+        "misses": misses,
+        "bypassed": counters.get("bypass", 0),
+        "hit_ratio": hit_ratio(hits, misses),
+    }
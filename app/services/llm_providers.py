@@ -0,0 +1,204 @@
+import asyncio
+import hashlib
+import random
+import re
+import time
+from typing import Any, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableLambda
+from pydantic import PrivateAttr
+from slugify import slugify
+
+from app.core.config import (
+    LLM_PROVIDER, LLM_MODEL, LLM_TEMPERATURE, LLM_MAX_TOKENS,
+    FAKE_LLM_LATENCY_SECONDS, FAKE_LLM_FAILURE_RATE, FAKE_LLM_SEED, FAKE_LLM_CHAPTERS, FAKE_LLM_SECTIONS
+)
+from app.schemas.course import CourseOutline, DetailedChapter
+from app.schemas.roadmap import RoadmapOutline
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class FakeLLMError(RuntimeError):
+    """Raised by the fake provider when a failure is injected."""
+
+
+def _find(pattern: str, text: str, default: str) -> str:
+    match = re.search(pattern, text)
+    return match.group(1).strip() if match else default
+
+
+def _digest(text: str) -> int:
+    return int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:8], 16)
+
+
+def fake_course_outline(prompt: str, chapters: int = FAKE_LLM_CHAPTERS) -> CourseOutline:
+    topic = _find(r"for the topic:\s*(.+)", prompt, "Fake Topic")
+    level = _find(r"Course difficulty:\s*(.+)", prompt, "Beginner")
+    return CourseOutline(
+        course_title=topic,
+        course_slug=slugify(topic),
+        course_description=f"A {level.lower()} course on {topic}.",
+        level=level,
+        total_chapters=chapters,
+        duration=chapters * 30,
+        chapters=[
+            {
+                "chapter_number": number,
+                "title": f"{topic} part {number}",
+                "description": f"Part {number} of {topic}.",
+                "learning_objectives": [f"Understand {topic} concept {number}.{i}" for i in range(1, 4)],
+                "estimated_duration": 30
+            }
+            for number in range(1, chapters + 1)
+        ]
+    )
+
+
+def fake_detailed_chapter(prompt: str, sections: int = FAKE_LLM_SECTIONS) -> DetailedChapter:
+    number = int(_find(r"Chapter (\d+):", prompt, "1"))
+    title = _find(r"Chapter \d+:\s*(.+)", prompt, "Fake chapter")
+    kinds = ["content", "info", "code", "tip"]
+    offset = _digest(prompt)
+    items = []
+    for i in range(sections):
+        kind = kinds[(offset + i) % len(kinds)]
+        items.append({
+            "type": kind,
+            "title": f"{title} - section {i + 1}",
+            "content": f"print('{title} {i + 1}')" if kind == "code" else f"{title}: point {i + 1}. " * 8,
+            "language": "python" if kind == "code" else None,
+            "explanation": "Prints a greeting." if kind == "code" else None
+        })
+    return DetailedChapter(id=number, title=title, duration="30 min", sections=items)
+
+
+def fake_roadmap_outline(prompt: str, steps: int = FAKE_LLM_CHAPTERS) -> RoadmapOutline:
+    name = _find(r"Roadmap Title:\s*(.+)", prompt, "Fake Roadmap")
+    difficulty = _find(r"Difficulty Level:\s*(.+)", prompt, "Beginner")
+    return RoadmapOutline(
+        name=name,
+        difficulty=difficulty,
+        slug=slugify(name),
+        description=f"Learning path for {name}.",
+        steps=[
+            {
+                "title": f"{name} step {index}",
+                "description": f"Step {index} of {name}.",
+                "topic_slug": slugify(f"{name} step {index}"),
+                "order_index": index
+            }
+            for index in range(1, steps + 1)
+        ]
+    )
+
+
+class FakeCourseChatModel(BaseChatModel):
+    """
+    Offline stand-in for the Groq chat model. Output is derived only from the
+    prompt, so it is deterministic and always valid for CourseOutline,
+    DetailedChapter and RoadmapOutline; plain calls (chapter expansion, the
+    output fixer) return DetailedChapter JSON. Every call sleeps `latency`
+    seconds and raises FakeLLMError for a `failure_rate` share of calls,
+    drawn from a RNG seeded with `seed`.
+    """
+
+    model_name: str = "fake"
+    latency: float = FAKE_LLM_LATENCY_SECONDS
+    failure_rate: float = FAKE_LLM_FAILURE_RATE
+    seed: int = FAKE_LLM_SEED
+    chapters: int = FAKE_LLM_CHAPTERS
+    sections: int = FAKE_LLM_SECTIONS
+    calls: int = 0
+
+    _rng: random.Random = PrivateAttr()
+
+    def model_post_init(self, context: Any):
+        super().model_post_init(context)
+        self._rng = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-course"
+
+    def _start_call(self):
+        self.calls += 1
+        if self.failure_rate and self._rng.random() < self.failure_rate:
+            raise FakeLLMError(f"Injected failure on fake LLM call {self.calls}")
+
+    def _chapter_result(self, messages: List[BaseMessage]) -> ChatResult:
+        prompt = "\n".join(str(message.content) for message in messages)
+        chapter = fake_detailed_chapter(prompt, self.sections)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=chapter.model_dump_json()))])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs):
+        time.sleep(self.latency)
+        self._start_call()
+        return self._chapter_result(messages)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        self._start_call()
+        return self._chapter_result(messages)
+
+    def with_structured_output(self, schema, **kwargs):
+        builders = {
+            CourseOutline: lambda prompt: fake_course_outline(prompt, self.chapters),
+            DetailedChapter: lambda prompt: fake_detailed_chapter(prompt, self.sections),
+            RoadmapOutline: lambda prompt: fake_roadmap_outline(prompt, self.chapters),
+        }
+        if schema not in builders:
+            raise ValueError(f"Fake LLM has no structured output for {schema}")
+        build = builders[schema]
+
+        def run(prompt_value):
+            time.sleep(self.latency)
+            self._start_call()
+            return build(prompt_value.to_string())
+
+        async def arun(prompt_value):
+            await asyncio.sleep(self.latency)
+            self._start_call()
+            return build(prompt_value.to_string())
+
+        return RunnableLambda(run, afunc=arun)
+
+
+def build_groq_llm():
+    from langchain_groq import ChatGroq
+
+    return ChatGroq(
+        temperature=LLM_TEMPERATURE,
+        model_name=LLM_MODEL,
+        max_tokens=LLM_MAX_TOKENS
+    )
+
+
+def build_fake_llm():
+    return FakeCourseChatModel()
+
+
+LLM_PROVIDERS = {
+    "groq": build_groq_llm,
+    "fake": build_fake_llm,
+}
+
+_llm = None
+
+
+def get_llm():
+    """
+    The chat model of the configured LLM_PROVIDER, built once per process
+    and shared by course and roadmap generation.
+    """
+    global _llm
+    if _llm is None:
+        if LLM_PROVIDER not in LLM_PROVIDERS:
+            raise ValueError(f"Unknown LLM_PROVIDER '{LLM_PROVIDER}', expected one of {sorted(LLM_PROVIDERS)}")
+        logger.info(f"Using LLM provider '{LLM_PROVIDER}'")
+        _llm = LLM_PROVIDERS[LLM_PROVIDER]()
+    return _llm
@@ -1,22 +1,22 @@
-from langchain_groq import ChatGroq
 from langchain.prompts import ChatPromptTemplate
 import asyncio
 
 from app.utils.logger import get_logger
 from app.schemas.roadmap import RoadmapOutline,RoadmapCreateRequest
-from app.db.roadmap import create_roadmap,create_roadmap_step
+from app.db.roadmap import create_roadmap_with_steps
+from app.db.db import get_db_session
+from app.core.config import LLM_COMPLETION_TOKEN_ESTIMATE
+from app.services.llm_cache import cached_llm_call
+from app.services.llm_providers import get_llm
+from app.utils.rate_limiter import llm_rate_limiter, estimate_tokens
 
 logger = get_logger(__name__)
 
-llm = ChatGroq(
-        temperature=0.3,
-        model_name="openai/gpt-oss-20b",
-        max_tokens=4000
-    )
+llm = get_llm()
 
 
 
-def generate_roadmap(name: str, difficulty: str = "Beginner"):
+async def generate_roadmap(name: str, difficulty: str = "Beginner", use_cache: bool = True):
     """
     Generate a complete learning roadmap using LLM with structured output.
     """
@@ -61,36 +61,34 @@ def generate_roadmap(name: str, difficulty: str = "Beginner"):
     ])
 
     chain = prompt_template | llm_chain
-
-    result = chain.invoke({
+    inputs = {
         "roadmap_name": name,
         "difficulty": difficulty,
-    })
+    }
+
+    async def invoke():
+        await llm_rate_limiter.acquire(estimate_tokens(name, difficulty) + LLM_COMPLETION_TOKEN_ESTIMATE)
+        return await chain.ainvoke(inputs)
+
+    result = await cached_llm_call("roadmap", llm, prompt_template, inputs, RoadmapOutline, invoke, use_cache)
 
     logger.info(f"Generated roadmap '{result.name}' with {len(result.steps)} steps.")
 
     return result
-def generate_roadmap_handler(payload: RoadmapCreateRequest):
+async def generate_roadmap_handler(payload: RoadmapCreateRequest):
     logger.info(f"Roadmap generation request received | name='{payload.name}', difficulty='{payload.difficulty}'")
 
     try:
         
         logger.info("Invoking LLM to generate roadmap structure...")
-        result = generate_roadmap(payload.name, payload.difficulty)
+        result = await generate_roadmap(payload.name, payload.difficulty, use_cache=not payload.refresh)
         logger.info(f"LLM generated roadmap outline with {len(result.steps)} steps")
 
-        logger.info("Saving roadmap to database...")
-        roadmap_obj = create_roadmap(result)
-        logger.info(f"Roadmap saved | id={roadmap_obj.id}, slug='{roadmap_obj.slug}'")
-
-        logger.info("Saving roadmap steps to database...")
-        for step in result.steps:
-            logger.debug(
-                f"Creating step | order={step.order_index}, title='{step.title}', topic_slug='{step.topic_slug}'"
-            )
-            create_roadmap_step(step, roadmap_obj.id)
+        logger.info("Saving roadmap and its steps to database...")
+        async with get_db_session() as db:
+            roadmap_obj = await create_roadmap_with_steps(db, result)
 
-        logger.info(f"All {len(result.steps)} steps saved for roadmap id={roadmap_obj.id}")
+        logger.info(f"Roadmap saved | id={roadmap_obj.id}, slug='{roadmap_obj.slug}' with {len(result.steps)} steps")
 
         return roadmap_obj
 
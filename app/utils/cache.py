@@ -0,0 +1,317 @@
+import asyncio
+import json
+import time
+import uuid
+from threading import Lock
+from cachetools import TTLCache, TLRUCache
+
+from app.core.config import (
+    CONTENT_CACHE_MAXSIZE, CONTENT_CACHE_TTL_SECONDS,
+    CACHE_BACKEND, REDIS_URL, CACHE_LOCK_TIMEOUT_SECONDS,
+    AUTH_TOKEN_CACHE_MAXSIZE, AUTH_USER_CACHE_MAXSIZE, AUTH_USER_CACHE_TTL_SECONDS
+)
+from app.db.db import get_db_session
+from app.utils.metrics import metrics, hit_ratio
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class CacheBackend:
+    """
+    Storage interface used by ContentCache. Values are JSON-compatible data.
+
+    `acquire_lock` / `release_lock` guard the fill of a cold key across
+    processes: acquire returns a token, or None when another process holds
+    the lock. `lock_held` tells a waiter whether that fill is still running.
+    Backends private to one process never need to wait.
+    """
+
+    async def get(self, key):
+        raise NotImplementedError
+
+    async def set(self, key, value):
+        raise NotImplementedError
+
+    async def delete(self, *keys):
+        raise NotImplementedError
+
+    async def clear(self):
+        raise NotImplementedError
+
+    async def acquire_lock(self, key, timeout: float):
+        return True
+
+    async def release_lock(self, key, token):
+        pass
+
+    async def lock_held(self, key):
+        return False
+
+    async def size(self):
+        return None
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    Bounded LRU with per-entry TTL, private to the current process.
+    """
+
+    def __init__(self, maxsize: int, ttl: int):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = Lock()
+
+    async def get(self, key):
+        with self._lock:
+            return self._cache.get(key)
+
+    async def set(self, key, value):
+        with self._lock:
+            self._cache[key] = value
+
+    async def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._cache.pop(key, None)
+
+    async def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    async def size(self):
+        return len(self._cache)
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Shared cache on any server speaking the Redis protocol (Redis, Valkey,
+    or a local fake such as fakeredis for tests). Entries expire after `ttl`.
+    """
+
+    def __init__(self, url: str = None, ttl: int = CONTENT_CACHE_TTL_SECONDS, prefix: str = "learnlabs:", client=None):
+        if client is None:
+            try:
+                import redis.asyncio as redis
+            except ImportError as e:
+                raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package") from e
+            client = redis.from_url(url)
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def _key(self, key):
+        return f"{self.prefix}{key}"
+
+    async def get(self, key):
+        raw = await self.client.get(self._key(key))
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key, value):
+        await self.client.set(self._key(key), json.dumps(value, default=str), ex=self.ttl)
+
+    async def delete(self, *keys):
+        if keys:
+            await self.client.delete(*[self._key(key) for key in keys])
+
+    async def clear(self):
+        async for key in self.client.scan_iter(match=f"{self.prefix}*"):
+            await self.client.delete(key)
+
+    async def acquire_lock(self, key, timeout: float):
+        token = uuid.uuid4().hex
+        acquired = await self.client.set(self._key(f"lock:{key}"), token, nx=True, px=int(timeout * 1000))
+        return token if acquired else None
+
+    async def release_lock(self, key, token):
+        # Only delete the lock if we still own it (it may have expired and been re-taken).
+        # Plain GET + DEL rather than a Lua script so minimal RESP servers work too
+        lock_key = self._key(f"lock:{key}")
+        current = await self.client.get(lock_key)
+        if current is not None and (current.decode() if isinstance(current, bytes) else current) == token:
+            await self.client.delete(lock_key)
+
+    async def lock_held(self, key):
+        return bool(await self.client.exists(self._key(f"lock:{key}")))
+
+    async def size(self):
+        return await self.client.dbsize()
+
+
+class ContentCache:
+    """
+    Read-through cache in front of the course and roadmap read paths.
+
+    Values must be plain data (dicts/lists), never ORM objects, so they can be
+    shared between requests and workers. Empty results are not cached: content
+    that does not exist yet (a course still being generated) must show up once
+    written.
+
+    Cold keys are filled once (single-flight): concurrent callers in this
+    process await the same load, and when the backend is shared, other workers
+    wait for the lock holder's result instead of querying the DB themselves.
+    Backend errors degrade to a cache miss.
+    """
+
+    def __init__(self, name: str, backend: CacheBackend, lock_timeout: float = CACHE_LOCK_TIMEOUT_SECONDS):
+        self.name = name
+        self.backend = backend
+        self.lock_timeout = lock_timeout
+        self._inflight = {}
+
+    async def get(self, key):
+        try:
+            value = await self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"Cache get failed for '{key}': {str(e)}")
+            value = None
+        metrics.incr(self.name, "hit" if value is not None else "miss")
+        return value
+
+    async def set(self, key, value):
+        if not value:
+            return
+        try:
+            await self.backend.set(key, value)
+        except Exception as e:
+            logger.warning(f"Cache set failed for '{key}': {str(e)}")
+
+    async def delete(self, *keys):
+        try:
+            await self.backend.delete(*keys)
+        except Exception as e:
+            logger.warning(f"Cache delete failed for {keys}: {str(e)}")
+
+    async def clear(self):
+        await self.backend.clear()
+
+    async def get_or_load(self, key, loader):
+        """
+        Return the cached value for `key`, or await `loader(db)` and cache its result.
+
+        The loader gets a session opened for the fill rather than closing over
+        the caller's: the fill is shared by every caller waiting on the key and
+        may outlive the request that started it.
+        """
+        value = await self.get(key)
+        if value is not None:
+            return value
+
+        task = self._inflight.get(key)
+        if task:
+            metrics.incr(self.name, "coalesced")
+        else:
+            # The fill runs in its own task, so the caller that started it can be
+            # cancelled without cancelling the load the other callers wait for
+            task = asyncio.create_task(self._fill(key, loader))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _fill(self, key, loader):
+        try:
+            token = await self.backend.acquire_lock(key, self.lock_timeout)
+        except Exception as e:
+            logger.warning(f"Cache lock failed for '{key}': {str(e)}")
+            token = False  # load without the lock
+
+        if token is None:
+            # Another worker is filling this key, wait for its result
+            value = await self._wait_for_fill(key)
+            if value is not None:
+                metrics.incr(self.name, "coalesced")
+                return value
+
+        try:
+            async with get_db_session() as db:
+                value = await loader(db)
+            await self.set(key, value)
+            return value
+        finally:
+            if token:
+                try:
+                    await self.backend.release_lock(key, token)
+                except Exception as e:
+                    logger.warning(f"Cache unlock failed for '{key}': {str(e)}")
+
+    async def _wait_for_fill(self, key):
+        deadline = time.monotonic() + self.lock_timeout
+        delay = 0.02
+        while time.monotonic() < deadline:
+            await asyncio.sleep(delay)
+            try:
+                value = await self.backend.get(key)
+            except Exception:
+                return None
+            if value is not None:
+                return value
+            try:
+                # Lock gone without a value: the load found nothing (empty results
+                # are not cached) or its holder died, so stop waiting and load
+                if not await self.backend.lock_held(key):
+                    return None
+            except Exception:
+                return None
+            delay = min(delay * 2, 0.5)
+        return None
+
+    async def stats(self):
+        counters = metrics.get(self.name)
+        hits = counters.get("hit", 0)
+        misses = counters.get("miss", 0)
+        try:
+            size = await self.backend.size()
+        except Exception:
+            size = None
+        return {
+            "backend": type(self.backend).__name__,
+            "size": size,
+            "hits": hits,
+            "misses": misses,
+            "coalesced": counters.get("coalesced", 0),
+            "hit_ratio": hit_ratio(hits, misses),
+        }
+
+
+class ExpiringCache:
+    """
+    In-process LRU whose entries each expire at their own unix timestamp,
+    e.g. a decoded JWT is kept exactly until the token's `exp`.
+    """
+
+    def __init__(self, name: str, maxsize: int):
+        self.name = name
+        self._cache = TLRUCache(maxsize=maxsize, ttu=lambda key, value, now: value[0], timer=time.time)
+        self._lock = Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._cache.get(key)
+        metrics.incr(self.name, "hit" if entry is not None else "miss")
+        return entry[1] if entry is not None else None
+
+    def set(self, key, value, expires_at: float):
+        if expires_at <= time.time():
+            return
+        with self._lock:
+            self._cache[key] = (expires_at, value)
+
+    def stats(self):
+        counters = metrics.get(self.name)
+        hits = counters.get("hit", 0)
+        misses = counters.get("miss", 0)
+        return {"size": len(self._cache), "hits": hits, "misses": misses, "hit_ratio": hit_ratio(hits, misses)}
+
+
+def get_cache_backend(kind: str = CACHE_BACKEND, maxsize: int = CONTENT_CACHE_MAXSIZE,
+                      ttl: int = CONTENT_CACHE_TTL_SECONDS) -> CacheBackend:
+    if kind == "redis":
+        return RedisCacheBackend(REDIS_URL, ttl=ttl)
+    if kind == "memory":
+        return MemoryCacheBackend(maxsize, ttl)
+    raise ValueError(f"Unknown CACHE_BACKEND '{kind}'")
+
+
+content_cache = ContentCache("content_cache", get_cache_backend())
+# User rows change (unlike generated content), so they live for a short TTL only
+user_cache = ContentCache("user_cache", get_cache_backend(maxsize=AUTH_USER_CACHE_MAXSIZE, ttl=AUTH_USER_CACHE_TTL_SECONDS))
+token_cache = ExpiringCache("token_cache", AUTH_TOKEN_CACHE_MAXSIZE)
@@ -0,0 +1,43 @@
+import asyncio
+from collections import defaultdict
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class JobEventBroker:
+    """
+    In-process pub/sub of job events, consumed by GET /jobs/{id}/events.
+
+    Only subscribers in the process running the job see its events; the SSE
+    endpoint falls back to polling the job row for jobs run by other workers.
+    Every event carries the full job status, so a slow subscriber losing its
+    oldest queued events still ends up with the latest state.
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, job_id: int) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[job_id].add(queue)
+        return queue
+
+    def unsubscribe(self, job_id: int, queue: asyncio.Queue):
+        subscribers = self._subscribers.get(job_id)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            self._subscribers.pop(job_id, None)
+
+    def publish(self, job_id: int, event: str, data: dict):
+        for queue in self._subscribers.get(job_id, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait((event, data))
+
+
+job_events = JobEventBroker()
@@ -0,0 +1,41 @@
+import hashlib
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core.config import HTTP_CACHE_CONTROL
+
+# For content that may still change (a course mid-generation): cache, but revalidate every time
+REVALIDATE = "no-cache"
+
+
+def etag_for(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so ignore W/ prefixes
+    candidates = [value.strip().removeprefix("W/") for value in header.split(",")]
+    return etag in candidates
+
+
+def cached_json_response(request: Request, content, cache_control: str = HTTP_CACHE_CONTROL) -> Response:
+    """
+    Serialize `content` like FastAPI would, tag it with a strong ETag derived
+    from the body and answer 304 Not Modified when the client already has it.
+    """
+    response = JSONResponse(content=jsonable_encoder(content))
+    etag = etag_for(response.body)
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return response
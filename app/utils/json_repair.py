@@ -0,0 +1,71 @@
+import re
+
+_FENCE = re.compile(r"```(?:json)?\s*(.*?)(?:```|$)", re.DOTALL | re.IGNORECASE)
+# A backslash and the character it escapes, matched as a pair so the second
+# backslash of a valid `\\` escape is never read as the start of another one
+_ESCAPE = re.compile(r"\\(.)", re.DOTALL)
+_VALID_ESCAPES = '"\\/bfnrtu'
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+# A key at the end of truncated text with no value (yet), e.g. `, "title"` or `{"title":`
+_DANGLING_KEY = re.compile(r'([{,])\s*"(?:[^"\\]|\\.)*"\s*:?\s*$')
+# An element left empty by the truncation, e.g. `[{...}, {}]`
+_EMPTY_TAIL_ELEMENT = re.compile(r",\s*\{\s*\}(?=\s*\])")
+
+
+def extract_json(text: str) -> str:
+    """
+    The JSON part of an LLM reply: the body of a ```json fence if there is one,
+    else everything from the first brace or bracket on (leading prose dropped).
+    """
+    fenced = _FENCE.search(text)
+    if fenced:
+        text = fenced.group(1)
+    starts = [index for index in (text.find("{"), text.find("[")) if index != -1]
+    return text[min(starts):].strip() if starts else text.strip()
+
+
+def close_truncated_json(text: str) -> str:
+    """
+    Terminate JSON cut off mid-way (e.g. by max_tokens): close the open string,
+    drop a dangling key or separator and close every open object/array.
+    """
+    stack = []
+    in_string = False
+    escaped = False
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]" and stack:
+            stack.pop()
+
+    if not stack and not in_string:
+        return text
+    if escaped:
+        text = text[:-1]
+    if in_string:
+        text += '"'
+    if stack and stack[-1] == "}":
+        text = _DANGLING_KEY.sub(r"\1", text.rstrip())
+    text = text.rstrip().rstrip(",").rstrip()
+    return _EMPTY_TAIL_ELEMENT.sub("", text + "".join(reversed(stack)))
+
+
+def repair_json(text: str) -> str:
+    """
+    Best-effort local repair of malformed LLM JSON, without another LLM call.
+    The result still has to be parsed (with strict=False for raw newlines).
+    """
+    text = extract_json(text)
+    # Double the backslash of an invalid escape, e.g. "C:\path" or "\d+" in code samples
+    text = _ESCAPE.sub(lambda m: m.group(0) if m.group(1) in _VALID_ESCAPES else "\\\\" + m.group(1), text)
+    text = close_truncated_json(text)
+    return _TRAILING_COMMA.sub(r"\1", text)
@@ -0,0 +1,36 @@
+from collections import defaultdict
+from threading import Lock
+
+
+class MetricsRegistry:
+    """
+    Minimal in-process counters grouped by subsystem, e.g.
+    metrics.incr("db_query_cache", "cache_hit"). Exposed through GET /metrics.
+    """
+
+    def __init__(self):
+        self._counters = defaultdict(lambda: defaultdict(int))
+        self._lock = Lock()
+
+    def incr(self, group: str, name: str, amount: int = 1):
+        with self._lock:
+            self._counters[group][name] += amount
+
+    def get(self, group: str) -> dict:
+        with self._lock:
+            return dict(self._counters.get(group, {}))
+
+    def reset(self, group: str = None):
+        with self._lock:
+            if group:
+                self._counters.pop(group, None)
+            else:
+                self._counters.clear()
+
+
+def hit_ratio(hits: int, misses: int):
+    total = hits + misses
+    return round(hits / total, 4) if total else None
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,45 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from app.core.config import PASSWORD_HASH_EXECUTOR, PASSWORD_HASH_WORKERS
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class PasswordPool:
+    """
+    Bounded executor for bcrypt work so hashing never blocks the event loop.
+
+    bcrypt releases the GIL while it hashes, so the default thread pool scales
+    across cores; the process pool is there for interpreters where it does not.
+    At most `workers` hashes run at once, extra calls queue on the executor.
+    """
+
+    def __init__(self, kind: str = PASSWORD_HASH_EXECUTOR, workers: int = PASSWORD_HASH_WORKERS):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown password hash executor '{kind}'")
+        self.kind = kind
+        self.workers = max(workers, 1)
+        self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            logger.info(f"Starting password hash {self.kind} pool with {self.workers} workers")
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), fn, *args)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_pool = PasswordPool()
@@ -0,0 +1,78 @@
+import asyncio
+import time
+
+from app.core.config import LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class TokenBucket:
+    """
+    Classic token bucket: holds up to `capacity` tokens and refills
+    continuously at `capacity` tokens per `period` seconds.
+    """
+
+    def __init__(self, capacity: float, period: float = 60.0):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """
+        Seconds until `amount` tokens are available (0 if available now).
+        """
+        self._refill()
+        # A single request larger than the bucket can never fit, so cap it
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        self.tokens -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """
+    Async rate limiter enforcing both a requests/min and a tokens/min budget.
+
+    Callers `await limiter.acquire(tokens)` before every LLM call. Waiters are
+    served in FIFO order so a large request is not starved by small ones.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: int = 0):
+        async with self._lock:
+            while True:
+                delay = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+                if delay <= 0:
+                    break
+                logger.debug(f"Rate limit reached, waiting {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+            self.requests.consume(1)
+            self.tokens.consume(tokens)
+
+
+# Shared by every generation service so all LLM traffic in this process
+# draws from the same provider quota
+llm_rate_limiter = RateLimiter(LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE)
+
+
+def estimate_tokens(*texts) -> int:
+    """
+    Cheap token estimate (~4 characters per token) used to reserve quota
+    before a call, since the real usage is only known afterwards.
+    """
+    return sum(len(str(text)) for text in texts) // 4
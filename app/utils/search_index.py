@@ -0,0 +1,110 @@
+import heapq
+import math
+import re
+from collections import defaultdict
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have how in is it its of on or that the this to was what when "
+    "where which who why will with you your".split()
+)
+# Title matches count like this many body matches (setweight 'A' vs 'B' on Postgres)
+TITLE_WEIGHT = 3
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text: str) -> list:
+    """Lowercased alphanumeric words of `text`, stopwords dropped."""
+    return [token for token in _TOKEN.findall((text or "").lower()) if token not in STOPWORDS]
+
+
+class InvertedIndex:
+    """
+    In-process full-text index: term -> {doc_id: weighted term frequency},
+    ranked with BM25. Used where Postgres tsvector search is not available
+    (SQLite). Only ids, kinds and postings are kept; callers load the
+    documents of a result page themselves.
+    """
+
+    def __init__(self):
+        self.postings = defaultdict(dict)
+        self.lengths = {}
+        self.kinds = {}
+        self.total_length = 0
+        self.last_id = 0
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def add(self, doc_id: int, kind: str, title: str, body: str):
+        if doc_id in self.lengths:
+            return
+        frequencies = defaultdict(int)
+        for token in tokenize(title):
+            frequencies[token] += TITLE_WEIGHT
+        for token in tokenize(body):
+            frequencies[token] += 1
+        for token, frequency in frequencies.items():
+            self.postings[token][doc_id] = frequency
+        length = sum(frequencies.values())
+        self.lengths[doc_id] = length
+        self.kinds[doc_id] = kind
+        self.total_length += length
+        self.last_id = max(self.last_id, doc_id)
+
+    def search(self, query: str, kind: str = None, limit: int = 20, offset: int = 0):
+        """
+        Ids and scores of the documents containing every query term, best
+        first, for one page. Returns ([(doc_id, score)], has_more).
+        """
+        terms = set(tokenize(query))
+        if not terms or not self.lengths:
+            return [], False
+        postings = sorted((self.postings.get(term, {}) for term in terms), key=len)
+        if not postings[0]:
+            return [], False
+
+        # Intersect starting from the rarest term so the candidate set only shrinks
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                return [], False
+        if kind:
+            candidates = {doc_id for doc_id in candidates if self.kinds[doc_id] == kind}
+
+        count = len(self.lengths)
+        average_length = self.total_length / count or 1
+        weights = [(posting, math.log(1 + (count - len(posting) + 0.5) / (len(posting) + 0.5))) for posting in postings]
+
+        def score(doc_id):
+            norm = K1 * (1 - B + B * self.lengths[doc_id] / average_length)
+            total = 0.0
+            for posting, idf in weights:
+                frequency = posting[doc_id]
+                total += idf * frequency * (K1 + 1) / (frequency + norm)
+            return total
+
+        # Only rank as far as this page (plus one row to tell whether another exists)
+        ranked = heapq.nlargest(offset + limit + 1, ((score(doc_id), -doc_id) for doc_id in candidates))
+        page = [(-negative_id, value) for value, negative_id in ranked[offset:offset + limit]]
+        return page, len(ranked) > offset + limit
+
+
+def snippet(text: str, query: str, width: int = 160) -> str:
+    """
+    About `width` characters of `text` around the first query term, with the
+    query terms wrapped in <b></b> like Postgres ts_headline.
+    """
+    text = text or ""
+    terms = set(tokenize(query))
+    if not terms:
+        return text[:width]
+    pattern = re.compile(r"\b(" + "|".join(re.escape(term) for term in sorted(terms)) + r")\b", re.IGNORECASE)
+    match = pattern.search(text)
+    start = max(0, match.start() - width // 4) if match else 0
+    excerpt = text[start:start + width]
+    excerpt = pattern.sub(r"<b>\1</b>", excerpt)
+    return ("..." if start else "") + excerpt + ("..." if start + width < len(text) else "")
@@ -1,4 +1,13 @@
+from slugify import slugify
 
 
 def reverse_slugify(slug: str) -> str:
     return slug.replace("-", " ").title()
+
+
+def course_job_key(course) -> str:
+    """
+    Dedup key of a course create request: the requested slug, else the topic
+    name. Resume jobs reuse the key of the job that created the course.
+    """
+    return f"course:{course.slug or slugify(course.name)}"
@@ -0,0 +1,73 @@
+"""
+Rows/sec persisting generated chapters: one commit per section (the old
+create_chapter) versus the single-transaction bulk insert.
+
+    python -m benchmarks.bulk_insert --chapters 20 --sections 10
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import ensure_db_uri
+
+
+async def per_row_commit(db, course_id, chapter, content):
+    from app.db.models import Chapter, Section
+
+    new_chapter = Chapter(chapter_number=chapter.chapter_number, title=chapter.title,
+                          description=chapter.description, estimated_duration=chapter.estimated_duration,
+                          course_id=course_id)
+    db.add(new_chapter)
+    await db.commit()
+    for section in content.sections:
+        db.add(Section(type=section.type, title=section.title, content=section.content,
+                       language=section.language, explanation=section.explanation, chapter_id=new_chapter.id))
+        await db.commit()
+
+
+async def run(args):
+    from app.db.course import create_chapter
+    from app.db.db import get_db_engine, get_db_session, get_sync_db_engine
+    from app.db.models import Base, Course
+    from app.schemas.course import Chapter, DetailedChapter, Section
+
+    Base.metadata.create_all(get_sync_db_engine())
+    chapters = [
+        Chapter(chapter_number=i, title=f"Chapter {i}", description="chapter", learning_objectives=[],
+                estimated_duration=30)
+        for i in range(1, args.chapters + 1)
+    ]
+    content = DetailedChapter(id=1, title="Chapter", duration="30 min", sections=[
+        Section(type="content", title=f"Section {i}", content="y" * 1500) for i in range(args.sections)
+    ])
+
+    print(f"{'strategy':18} {'rows':>6} {'seconds':>8} {'rows/sec':>10}")
+    for label, persist in (("commit per row", per_row_commit), ("bulk per chapter", create_chapter)):
+        async with get_db_session() as db:
+            course = Course(title=label, slug=f"bulk-{label.replace(' ', '-')}-{time.time_ns()}")
+            db.add(course)
+            await db.commit()
+
+            start = time.perf_counter()
+            for chapter in chapters:
+                await persist(db, course.id, chapter, content)
+            elapsed = time.perf_counter() - start
+
+        rows = args.chapters * (args.sections + 1)
+        print(f"{label:18} {rows:6} {elapsed:8.3f} {rows / elapsed:10.0f}")
+
+    await get_db_engine().dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chapters", type=int, default=20)
+    parser.add_argument("--sections", type=int, default=10)
+    args = parser.parse_args()
+
+    ensure_db_uri()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
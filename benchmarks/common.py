@@ -0,0 +1,79 @@
+"""
+Shared fixtures for the benchmark scripts.
+"""
+import os
+import tempfile
+
+
+def ensure_db_uri():
+    """
+    Point DB_URI at a throwaway SQLite file unless one is configured.
+    Must run before anything under `app` is imported.
+    """
+    if not os.environ.get("DB_URI"):
+        os.environ["DB_URI"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    return os.environ["DB_URI"]
+
+
+def disable_content_cache():
+    """
+    Make every read miss the content cache, so a benchmark measures the
+    database work of a request instead of cache hits.
+    """
+    from app.utils.cache import CacheBackend, content_cache
+
+    class NullCacheBackend(CacheBackend):
+        async def get(self, key):
+            return None
+
+        async def set(self, key, value):
+            pass
+
+        async def delete(self, *keys):
+            pass
+
+        async def clear(self):
+            pass
+
+    content_cache.backend = NullCacheBackend()
+
+
+def seed(db, chapters=5, sections=10):
+    from app.db.models import Course, Chapter, Section, Roadmap, RoadmapStep
+
+    course = db.query(Course).first()
+    if not course:
+        course = Course(title="Benchmark Course", slug="benchmark-course", description="x" * 2000,
+                        level="Beginner", total_chapters=chapters, duration=300)
+        db.add(course)
+        db.flush()
+        for number in range(1, chapters + 1):
+            chapter = Chapter(chapter_number=number, title=f"Chapter {number}", description="chapter",
+                              estimated_duration=60, course_id=course.id)
+            db.add(chapter)
+            db.flush()
+            db.add_all([
+                Section(type="content", title=f"Section {i}", content="y" * 1000, chapter_id=chapter.id)
+                for i in range(sections)
+            ])
+
+    roadmap = db.query(Roadmap).first()
+    if not roadmap:
+        roadmap = Roadmap(name="Benchmark Roadmap", slug="benchmark-roadmap", description="roadmap",
+                          difficulty="Beginner")
+        db.add(roadmap)
+        db.flush()
+        db.add_all([
+            RoadmapStep(roadmap_id=roadmap.id, title=f"Step {i}", description="step",
+                        topic_slug=f"step-{i}", order_index=i)
+            for i in range(1, 16)
+        ])
+    db.commit()
+
+    chapter = db.query(Chapter).filter(Chapter.course_id == course.id).first()
+    return {
+        "course_id": course.id,
+        "course_slug": course.slug,
+        "chapter_id": chapter.id,
+        "roadmap_slug": roadmap.slug,
+    }
@@ -0,0 +1,123 @@
+"""
+EXPLAIN the hot-path queries and check that each one is answered from an
+index: no full table scan and, where the query is ordered, no extra sort.
+Exits with status 1 when a query falls back to a scan, so it can gate CI
+against a migrated database; tests/test_explain_indexes.py runs the same
+check under pytest.
+
+    DB_URI=postgresql+psycopg2://... python -m benchmarks.explain_indexes
+"""
+import argparse
+import json
+import re
+import sys
+
+from benchmarks.common import ensure_db_uri
+
+
+def hot_queries(dialect_name):
+    """
+    The statements the app runs on its hot paths, built by the same query
+    functions the loaders use, so the plans checked are the plans served.
+    """
+    from app.db.course import chapters_query, sections_query
+    from app.db.roadmap import roadmap_steps_query
+    from app.db.search import search_vectors_update
+    from app.db.userProgress import completed_chapters_query, progress_dashboard_query, progress_summaries_query
+
+    queries = {
+        "get_chapters": chapters_query(1),
+        "get_sections": sections_query(1),
+        "get_roadmap_steps_by_id": roadmap_steps_query(1),
+        "get_completed_chapters": completed_chapters_query(1, 1),
+        "refresh_progress_summaries": progress_summaries_query([(1, 1)]),
+        "get_progress_dashboard": progress_dashboard_query(1),
+    }
+    if dialect_name == "postgresql":
+        # tsvectors are only computed on Postgres
+        queries["index_course"] = search_vectors_update(1)
+    return queries
+
+
+# "SCAN <table>", as opposed to virtual scans like "SCAN CONSTANT ROW" of an IN list
+_SQLITE_SCAN = re.compile(r"^SCAN (\w+)")
+
+
+def sqlite_plan_problems(connection, sql):
+    """Problems in a SQLite EXPLAIN QUERY PLAN and the plan lines themselves."""
+    from app.db.models import Base
+
+    plan = [row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").all()]
+    problems = []
+    for line in plan:
+        scan = _SQLITE_SCAN.match(line)
+        if scan and scan.group(1) in Base.metadata.tables and "INDEX" not in line:
+            problems.append(f"full scan: {line}")
+        # A GROUP BY over a handful of rows is fine, an unindexed ORDER BY is not
+        if "TEMP B-TREE" in line and "ORDER BY" in line:
+            problems.append(f"extra sort: {line}")
+    return problems, plan
+
+
+def postgres_plan_problems(connection, sql):
+    """Problems in a PostgreSQL EXPLAIN plan and the node types it uses."""
+    # Tables in a fresh database are tiny and a scan would be cheaper; ask
+    # whether an index *can* serve the query, not whether it is worth it yet
+    connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    nodes, problems = [], []
+    pending = [(plan[0]["Plan"], None)]
+    while pending:
+        node, parent = pending.pop()
+        nodes.append(f"{node['Node Type']} {node.get('Index Name') or node.get('Relation Name') or ''}".strip())
+        if node["Node Type"] == "Seq Scan":
+            problems.append(f"full scan: {node['Relation Name']}")
+        # Sorting the rows of a GROUP BY is fine, sorting for an ORDER BY is not
+        if node["Node Type"] in ("Sort", "Incremental Sort") and parent != "Aggregate":
+            problems.append(f"extra sort: {node.get('Sort Key')}")
+        pending.extend((child, node["Node Type"]) for child in node.get("Plans", []))
+    return problems, nodes
+
+
+def explain_hot_queries():
+    """
+    EXPLAIN every hot query against DB_URI: {name: (problems, plan)}.
+    DB_URI must be set before calling (see ensure_db_uri).
+    """
+    from app.db.db import get_sync_db_engine
+    from app.db.models import Base
+
+    engine = get_sync_db_engine()
+    if engine.dialect.name == "sqlite":
+        # A throwaway SQLite file has no migrations applied
+        Base.metadata.create_all(engine)
+    explain = postgres_plan_problems if engine.dialect.name == "postgresql" else sqlite_plan_problems
+
+    results = {}
+    with engine.connect() as connection:
+        for name, query in hot_queries(engine.dialect.name).items():
+            sql = str(query.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+            with connection.begin():
+                results[name] = explain(connection, sql)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args()
+
+    ensure_db_uri()
+    failed = 0
+    for name, (problems, plan) in explain_hot_queries().items():
+        failed += bool(problems)
+        print(f"{'FAIL' if problems else 'ok':4} {name}")
+        for line in problems + (plan if args.verbose else []):
+            print(f"       {line}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
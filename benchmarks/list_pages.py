@@ -0,0 +1,55 @@
+"""
+Payload size and latency of one GET /course/ page as the catalog grows,
+for the first page and a page deep in the keyset.
+
+    python -m benchmarks.list_pages --sizes 1000 10000 50000 --limit 20
+"""
+import argparse
+import time
+
+from benchmarks.common import ensure_db_uri
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000], help="catalog sizes to test")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=50, help="requests per measurement")
+    args = parser.parse_args()
+
+    ensure_db_uri()
+    from sqlalchemy import insert, func, select
+    from fastapi.testclient import TestClient
+    from app.db.db import get_sync_db_engine, get_sync_db_session
+    from app.db.models import Base, Course
+    from app.main import app
+
+    Base.metadata.create_all(get_sync_db_engine())
+    client = TestClient(app)
+
+    def timed(params):
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            response = client.get("/course/", params=params)
+        return len(response.content), (time.perf_counter() - start) / args.repeat * 1000
+
+    print(f"{'courses':>8} {'page':>6} {'bytes':>7} {'ms/page':>8}")
+    for size in sorted(args.sizes):
+        with get_sync_db_session() as db:
+            existing = db.execute(select(func.count(Course.id))).scalar()
+            if existing < size:
+                db.execute(insert(Course), [
+                    {"title": f"Course {i}", "slug": f"list-bench-{i}", "description": "x" * 2000,
+                     "level": "Beginner", "total_chapters": 10, "duration": 600}
+                    for i in range(existing, size)
+                ])
+                db.commit()
+            deep_cursor = db.execute(select(Course.id).order_by(Course.id).offset(size - args.limit - 1).limit(1)).scalar()
+
+        for label, params in (("first", {"limit": args.limit}), ("deep", {"limit": args.limit, "after": deep_cursor})):
+            size_bytes, ms = timed(params)
+            print(f"{size:8} {label:>6} {size_bytes:7} {ms:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+POST /auth/login throughput with bcrypt run inline on the event loop versus
+the password hashing pool, plus the worst event-loop stall seen meanwhile.
+
+    python -m benchmarks.login_throughput --logins 64 --rounds 12
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks.common import ensure_db_uri
+
+
+async def run_logins(app, logins: int, concurrency: int):
+    import httpx
+
+    semaphore = asyncio.Semaphore(concurrency)
+    stall = 0.0
+    done = asyncio.Event()
+
+    async def ticker():
+        # A responsive loop wakes up every 10ms; anything longer is time bcrypt held it
+        nonlocal stall
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            stall = max(stall, time.perf_counter() - start - 0.01)
+
+    async def login(client):
+        async with semaphore:
+            response = await client.post("/auth/login", json={"identifier": "bench", "password": "bench-password"})
+            assert response.status_code == 200, response.text
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await login(client)  # warm up
+        tick = asyncio.create_task(ticker())
+        start = time.perf_counter()
+        await asyncio.gather(*(login(client) for _ in range(logins)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await tick
+    return elapsed, stall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16, help="logins in flight at once")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost")
+    args = parser.parse_args()
+
+    ensure_db_uri()
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    from app.db.auth import hash_password
+    from app.db.db import get_db_engine, get_sync_db_engine, get_sync_db_session
+    from app.db.models import Base, User
+    from app.main import app
+    from app.utils import password_pool as pool_module
+
+    Base.metadata.create_all(get_sync_db_engine())
+    with get_sync_db_session() as db:
+        if not db.query(User).filter(User.username == "bench").first():
+            db.add(User(username="bench", email="bench@example.com",
+                        hashed_password=hash_password("bench-password", args.rounds)))
+            db.commit()
+
+    class InlinePool:
+        # The old behaviour: bcrypt called directly inside the request handler
+        async def run(self, fn, *a):
+            return fn(*a)
+
+    cores = os.cpu_count() or 1
+    modes = [("inline", InlinePool(), 1), ("pool x1", pool_module.PasswordPool("thread", 1), 1)]
+    if cores > 1:
+        modes.append((f"pool x{cores}", pool_module.PasswordPool("thread", cores), cores))
+
+    async def bench():
+        import app.db.auth as auth
+        print(f"{'mode':10} {'logins/s':>9} {'per core':>9} {'max stall ms':>13}")
+        for label, pool, used_cores in modes:
+            auth.password_pool = pool
+            elapsed, stall = await run_logins(app, args.logins, args.concurrency)
+            rate = args.logins / elapsed
+            print(f"{label:10} {rate:9.1f} {rate / used_cores:9.1f} {stall * 1000:13.1f}")
+            if hasattr(pool, "shutdown"):
+                pool.shutdown()
+        await get_db_engine().dispose()
+
+    asyncio.run(bench())
+
+
+if __name__ == "__main__":
+    main()
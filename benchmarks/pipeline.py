@@ -0,0 +1,80 @@
+"""
+End-to-end course generation throughput against the fake LLM provider:
+outline, chapter expansion, parsing, rate limiting and persistence, offline.
+
+    python -m benchmarks.pipeline --courses 20 --concurrency 4 --latency 0.5 --failure-rate 0.05
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from benchmarks.common import ensure_db_uri
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=2, help="courses generated at once (job workers)")
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds per fake LLM call")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="share of fake LLM calls that raise")
+    parser.add_argument("--chapters", type=int, default=5)
+    parser.add_argument("--sections", type=int, default=6)
+    parser.add_argument("--rpm", type=int, default=100000, help="LLM requests/min allowed by the rate limiter")
+    parser.add_argument("--lazy", action="store_true", help="store outlines only (lazy chapter mode)")
+    args = parser.parse_args()
+
+    ensure_db_uri()
+    os.environ.update({
+        "LLM_PROVIDER": "fake",
+        "FAKE_LLM_LATENCY_SECONDS": str(args.latency),
+        "FAKE_LLM_FAILURE_RATE": str(args.failure_rate),
+        "FAKE_LLM_CHAPTERS": str(args.chapters),
+        "FAKE_LLM_SECTIONS": str(args.sections),
+        "LLM_REQUESTS_PER_MINUTE": str(args.rpm),
+        "LLM_TOKENS_PER_MINUTE": str(args.rpm * 10000),
+        # Every course is new work: measure the pipeline, not the response cache
+        "LLM_CACHE_ENABLED": "false",
+    })
+    from app.db.db import get_db_engine, get_sync_db_engine
+    from app.db.models import Base
+    from app.schemas.course import CourseCreateRequest
+    from app.services.course_generation import generate_course_handler
+    from app.services.llm_providers import get_llm
+
+    Base.metadata.create_all(get_sync_db_engine())
+    run_id = int(time.time())
+
+    async def bench():
+        semaphore = asyncio.Semaphore(args.concurrency)
+        durations, failures = [], 0
+
+        async def generate(index):
+            nonlocal failures
+            request = CourseCreateRequest(name=f"Bench {run_id} topic {index}", difficulty="Beginner",
+                                          refresh=True, lazy=args.lazy)
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    await generate_course_handler(request)
+                    durations.append(time.perf_counter() - start)
+                except Exception:
+                    failures += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(generate(i) for i in range(args.courses)))
+        elapsed = time.perf_counter() - start
+        await get_db_engine().dispose()
+        return elapsed, durations, failures
+
+    elapsed, durations, failures = asyncio.run(bench())
+    ordered = sorted(durations) or [0.0]
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"{'courses':>8} {'failed':>7} {'wall s':>8} {'courses/min':>12} {'p50 s':>7} {'p95 s':>7} {'llm calls':>10}")
+    print(f"{len(durations):8} {failures:7} {elapsed:8.2f} {len(durations) / elapsed * 60:12.1f} "
+          f"{statistics.median(ordered):7.2f} {p95:7.2f} {get_llm().calls:10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Per-request CPU time of the course and roadmap read endpoints with and
+without SQLAlchemy's compiled-query cache.
+
+Runs against DB_URI (defaults to a throwaway SQLite file), seeding a course
+and a roadmap if the tables are empty. Each configuration runs in its own
+process because the engine reads DB_QUERY_CACHE_SIZE once at creation.
+
+    python -m benchmarks.query_cache --requests 500
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.common import ensure_db_uri
+
+ENDPOINTS = [
+    "/course/{course_id}",
+    "/course/get-course-slug/{course_slug}",
+    "/course/chapters/{course_id}",
+    "/course/chapters/{chapter_id}/sections",
+    "/roadmap/get-roadmaps",
+    "/roadmap/get-roadmap-slug/{roadmap_slug}",
+]
+
+
+def run_worker(requests):
+    """
+    Executed in a child process: hit every endpoint `requests` times and
+    print per-endpoint CPU microseconds per request as JSON.
+    """
+    from fastapi.testclient import TestClient
+    from app.db.db import get_sync_db_engine, get_sync_db_session, get_query_cache_stats
+    from app.db.models import Base
+    from app.main import app
+    from benchmarks.common import seed, disable_content_cache
+
+    Base.metadata.create_all(get_sync_db_engine())
+    with get_sync_db_session() as db:
+        ids = seed(db)
+
+    # Measure statement compilation, not content cache hits
+    disable_content_cache()
+    # No context manager: skip the lifespan so job workers do not start
+    client = TestClient(app)
+    results = {}
+    for endpoint in ENDPOINTS:
+        url = endpoint.format(**ids)
+        client.get(url)  # warm up connections and the compiled cache
+        start = time.process_time()
+        for _ in range(requests):
+            response = client.get(url)
+            response.raise_for_status()
+        results[endpoint] = (time.process_time() - start) / requests * 1e6
+
+    print(json.dumps({"cpu_us": results, "query_cache": get_query_cache_stats()}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300, help="requests per endpoint")
+    parser.add_argument("--cache-size", type=int, default=500, help="compiled cache size for the cached run")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.requests)
+        return
+
+    ensure_db_uri()
+    env = dict(os.environ)
+
+    runs = {}
+    for label, size in (("no cache", 0), ("cache", args.cache_size)):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.query_cache", "--worker", "--requests", str(args.requests)],
+            env={**env, "DB_QUERY_CACHE_SIZE": str(size)},
+            capture_output=True, text=True, check=True
+        ).stdout
+        runs[label] = json.loads(output.strip().splitlines()[-1])
+
+    print(f"{'endpoint':45} {'no cache (us)':>14} {'cache (us)':>12} {'saved':>7}")
+    for endpoint in ENDPOINTS:
+        uncached = runs["no cache"]["cpu_us"][endpoint]
+        cached = runs["cache"]["cpu_us"][endpoint]
+        print(f"{endpoint:45} {uncached:14.1f} {cached:12.1f} {(1 - cached / uncached) * 100:6.1f}%")
+    print(f"compiled cache stats: {runs['cache']['query_cache']}")
+
+
+if __name__ == "__main__":
+    main()
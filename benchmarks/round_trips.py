@@ -0,0 +1,64 @@
+"""
+HTTP requests and SQL round-trips needed to render one course page:
+the legacy chapter-by-chapter flow versus GET /course/{slug}/full.
+
+    python -m benchmarks.round_trips --chapters 12
+"""
+import argparse
+import time
+
+from benchmarks.common import ensure_db_uri
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chapters", type=int, default=12)
+    parser.add_argument("--sections", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=50, help="page views per flow")
+    args = parser.parse_args()
+
+    ensure_db_uri()
+    from sqlalchemy import event
+    from fastapi.testclient import TestClient
+    from app.db.db import get_db_engine, get_sync_db_engine, get_sync_db_session
+    from app.db.models import Base
+    from app.main import app
+    from benchmarks.common import seed, disable_content_cache
+
+    Base.metadata.create_all(get_sync_db_engine())
+    with get_sync_db_session() as db:
+        ids = seed(db, chapters=args.chapters, sections=args.sections)
+
+    # Every page view should reach the database, as a cold read does
+    disable_content_cache()
+    statements = []
+    event.listen(get_db_engine().sync_engine, "before_cursor_execute", lambda *a: statements.append(1))
+    client = TestClient(app)
+
+    def legacy_page():
+        requests = 0
+        course = client.get(f"/course/{ids['course_id']}").json()
+        chapters = client.get(f"/course/chapters/{course['id']}").json()
+        requests += 2
+        for chapter in chapters:
+            client.get(f"/course/chapters/{chapter['id']}/sections").json()
+            requests += 1
+        return requests
+
+    def full_page():
+        client.get(f"/course/{ids['course_slug']}/full").json()
+        return 1
+
+    print(f"{'flow':10} {'http/page':>10} {'sql/page':>9} {'ms/page':>9}")
+    for label, page in (("legacy", legacy_page), ("full", full_page)):
+        page()  # warm up
+        statements.clear()
+        start = time.perf_counter()
+        http = sum(page() for _ in range(args.repeat))
+        elapsed = time.perf_counter() - start
+        print(f"{label:10} {http / args.repeat:10.1f} {len(statements) / args.repeat:9.1f} "
+              f"{elapsed / args.repeat * 1000:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
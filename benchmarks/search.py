@@ -0,0 +1,82 @@
+"""
+Latency of GET /search/ as the number of indexed sections grows, for a
+selective and a common query, first page and a deeper page. On SQLite this
+measures the in-memory index (its first query includes loading it); on
+PostgreSQL the tsvector GIN index.
+
+    python -m benchmarks.search --sizes 10000 100000 300000 --limit 20
+"""
+import argparse
+import random
+import time
+
+from benchmarks.common import ensure_db_uri
+
+WORDS = (
+    "python rust async await pointer closure iterator decorator generator memory ownership borrow lifetime "
+    "thread lock channel queue socket request response cache index query join schema migration vector tensor "
+    "gradient layer model train batch epoch loss metric deploy container cluster service"
+).split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000], help="section documents to index")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=50, help="requests per measurement")
+    args = parser.parse_args()
+
+    ensure_db_uri()
+    from sqlalchemy import insert, func, select, text
+    from fastapi.testclient import TestClient
+    from app.db.db import get_sync_db_engine, get_sync_db_session
+    from app.db.models import Base, Course, SearchDocument
+    from app.main import app
+
+    Base.metadata.create_all(get_sync_db_engine())
+    client = TestClient(app)
+    rng = random.Random(0)
+
+    def timed(params):
+        start = time.perf_counter()
+        client.get("/search/", params=params)
+        first = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            response = client.get("/search/", params=params)
+        return len(response.json()["items"]), first, (time.perf_counter() - start) / args.repeat * 1000
+
+    with get_sync_db_session() as db:
+        course_id = db.execute(select(Course.id).where(Course.slug == "search-bench")).scalar()
+        if course_id is None:
+            course = Course(title="Search bench", slug="search-bench", description="Search benchmark documents")
+            db.add(course)
+            db.commit()
+            course_id = course.id
+
+    print(f"{'sections':>9} {'query':>18} {'page':>6} {'hits':>5} {'first ms':>9} {'ms/query':>9}")
+    for size in sorted(args.sizes):
+        with get_sync_db_session() as db:
+            existing = db.execute(select(func.count(SearchDocument.id)).where(SearchDocument.course_id == course_id)).scalar()
+            for start in range(existing, size, 10000):
+                db.execute(insert(SearchDocument), [
+                    {"kind": "section", "course_id": course_id, "title": " ".join(rng.sample(WORDS, 3)),
+                     "body": " ".join(rng.choice(WORDS) for _ in range(120))}
+                    for _ in range(start, min(size, start + 10000))
+                ])
+            if db.get_bind().dialect.name == "postgresql":
+                db.execute(text(
+                    "UPDATE search_documents SET search_vector = "
+                    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+                    "setweight(to_tsvector('english', coalesce(body, '')), 'B') WHERE search_vector IS NULL"
+                ))
+            db.commit()
+
+        for query in ("ownership borrow lifetime", "python"):
+            for label, offset in (("first", 0), ("deep", 10 * args.limit)):
+                hits, first, ms = timed({"q": query, "limit": args.limit, "offset": offset})
+                print(f"{size:9} {query[:18]:>18} {label:>6} {hits:5} {first:9.2f} {ms:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# Makes the repository root importable (app, benchmarks) when running `pytest`
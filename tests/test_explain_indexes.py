@@ -0,0 +1,15 @@
+"""
+Hot-path queries must be answered from an index: no full table scan and no
+extra sort for an ORDER BY. Runs against DB_URI, or a throwaway SQLite file.
+"""
+from benchmarks.common import ensure_db_uri
+
+ensure_db_uri()
+
+from benchmarks.explain_indexes import explain_hot_queries  # noqa: E402
+
+
+def test_hot_queries_use_indexes():
+    results = explain_hot_queries()
+    problems = {name: found for name, (found, plan) in results.items() if found}
+    assert not problems, f"queries not served by an index: {problems}"